@@ -0,0 +1,72 @@
+import csv
+import json
+import os
+import tempfile
+import time
+
+import safety
+from bench_moderation_client import QUERIES
+from safety import SAFETY_INSTRUCTION, make_api_call, parse_moderation_response, run_batch_moderation
+from stub_moderation_server import StubModerationServer
+
+ROWS = 600
+
+def write_inputs(directory: str) -> tuple:
+    queries = [f"{QUERIES[i % len(QUERIES)]} (#{i})" for i in range(ROWS)]
+    jsonl_path = os.path.join(directory, "queries.jsonl")
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for i, query in enumerate(queries):
+            f.write(json.dumps({"id": f"q{i}", "query": query}) + "\n")
+    csv_path = os.path.join(directory, "queries.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "query"])
+        writer.writeheader()
+        writer.writerows({"id": f"q{i}", "query": query} for i, query in enumerate(queries))
+    return queries, jsonl_path, csv_path
+
+def read_output(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    by_id = {record["id"]: record for record in records}
+    assert len(by_id) == len(records), "a row was moderated twice"
+    return by_id
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp, StubModerationServer(latency=0.02) as stub:
+        safety.API_URL, safety.API_KEY = stub.url, "stub"
+        queries, jsonl_path, csv_path = write_inputs(tmp)
+        expected = {f"q{i}": parse_moderation_response(stub.classify(q))[0] for i, q in enumerate(queries)}
+
+        # 1. Crash and resume: keep the first third of a finished run plus a half-written line
+        out_path = os.path.join(tmp, "verdicts.jsonl")
+        run_batch_moderation(jsonl_path, out_path, verbose=False)
+        with open(out_path, encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.writelines(lines[:ROWS // 3])
+            f.write(lines[ROWS // 3][:20])
+        requests_before = stub.requests
+        resumed = run_batch_moderation(jsonl_path, out_path, verbose=False)
+        verdicts = {row_id: record["verdict"] for row_id, record in read_output(out_path).items()}
+        assert verdicts == expected
+        assert resumed["skipped"] == ROWS // 3 and stub.requests - requests_before == ROWS - ROWS // 3
+        print(f"Resume check passed: {resumed['skipped']} rows skipped, {resumed['processed']} re-queried")
+
+        # 2. CSV input gives the same verdicts
+        csv_out = os.path.join(tmp, "verdicts_csv.jsonl")
+        run_batch_moderation(csv_path, csv_out, verbose=False)
+        assert {row_id: r["verdict"] for row_id, r in read_output(csv_out).items()} == expected
+        print("CSV check passed")
+
+        # 3. Throughput: the interactive path (one blocking call per query) vs the batch runner
+        sample = queries[:100]
+        start = time.perf_counter()
+        for query in sample:
+            make_api_call(query, SAFETY_INSTRUCTION)
+        sequential_rate = len(sample) / (time.perf_counter() - start)
+
+        print(f"\n--- {ROWS} queries, 20 ms stub latency ---")
+        stats = run_batch_moderation(jsonl_path, os.path.join(tmp, "fresh.jsonl"), max_concurrency=32)
+        print(f"\nmake_api_call (sequential): {sequential_rate:8.1f} queries/sec")
+        print(f"run_batch_moderation (32):  {stats['queries_per_sec']:8.1f} queries/sec "
+              f"({stats['queries_per_sec'] / sequential_rate:.1f}x)")
@@ -0,0 +1,57 @@
+import random
+import string
+import time
+
+from clean_query import (
+    iter_normalize_and_clean_queries,
+    normalize_and_clean_queries,
+    normalize_and_clean_query,
+)
+
+# --- Benchmark Corpus ---
+# A mix of plain questions, noisy punctuation, HTML, URLs/emails and non-ASCII text.
+SAMPLE_QUERIES = [
+    "How do I reverse a string in Python using slicing?",
+    "YoU WOn't BelieVe this!!! WhAt's the code 4 a loop? (Visit http://www.example.com!)",
+    "<p>Explain the <b>difference</b> between SQL JOIN types.</p>",
+    "Contact me at someone@example.com or www.example.org for details...",
+    "Ｆｕｌｌｗｉｄｔｈ ｔｅｘｔ and café ﬁligree — “quoted” text ™",
+    "What is the capital city of Australia?",
+    "   lots   of\twhitespace\n\nand ### symbols $$$ %%% here   ",
+]
+
+def build_corpus(size: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + string.punctuation + "  éü—™"
+    corpus = []
+    for i in range(size):
+        if i % 3 == 0:
+            corpus.append("".join(rng.choice(alphabet) for _ in range(rng.randint(10, 120))))
+        else:
+            corpus.append(rng.choice(SAMPLE_QUERIES))
+    return corpus
+
+def time_it(label: str, fn, corpus: list, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    per_query_us = best / len(corpus) * 1e6
+    print(f"{label:<40} {per_query_us:8.2f} us/query")
+    return per_query_us
+
+if __name__ == "__main__":
+    corpus = build_corpus(50_000)
+
+    # Sanity check: the fast path must produce exactly the same output
+    expected = [normalize_and_clean_query(text) for text in corpus]
+    assert normalize_and_clean_queries(corpus) == expected
+    assert list(iter_normalize_and_clean_queries(iter(corpus))) == expected
+
+    print(f"--- clean_query benchmark ({len(corpus)} queries) ---")
+    baseline = time_it("normalize_and_clean_query (per call)", lambda c: [normalize_and_clean_query(t) for t in c], corpus)
+    batch = time_it("normalize_and_clean_queries (batch)", normalize_and_clean_queries, corpus)
+    stream = time_it("iter_normalize_and_clean_queries", lambda c: list(iter_normalize_and_clean_queries(c)), corpus)
+    print(f"Speedup (batch):  {baseline / batch:.2f}x")
+    print(f"Speedup (stream): {baseline / stream:.2f}x")
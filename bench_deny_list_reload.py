@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bench_prompt_injection import QUERIES, build_phrases
+from prompt_injection import DenyListStore
+
+def write_phrase_file(path: str, count: int, seed: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# benchmark deny-list\n")
+        f.write("\n".join(build_phrases(count, seed=seed)))
+
+if __name__ == "__main__":
+    count = 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deny_list.txt")
+        write_phrase_file(path, count, seed=1)
+
+        # 1. Cold load time and memory
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = DenyListStore(path=path)
+        load_s = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"--- Deny-list reload benchmark ({count} phrases, {len(store.matcher)} unique) ---")
+        print(f"Initial load:     {load_s:.2f} s (version {store.version})")
+        print(f"Matcher memory:   {current / 1e6:.1f} MB resident, {peak / 1e6:.1f} MB peak during build")
+
+        # 2. Background reload while checks keep running
+        write_phrase_file(path, count, seed=2)
+        latencies = []
+        reload_start = time.perf_counter()
+        thread = store.reload_in_background()
+        i = 0
+        while thread.is_alive():
+            query = QUERIES[i % len(QUERIES)]
+            start = time.perf_counter()
+            store.contains_any(query)
+            latencies.append(time.perf_counter() - start)
+            i += 1
+        reload_s = time.perf_counter() - reload_start
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(f"Background reload: {reload_s:.2f} s (now version {store.version}, generation {store.generation})")
+        print(f"Checks served during reload: {len(latencies)} (p50 {p50:.1f} us, p99 {p99:.1f} us, max {latencies[-1] * 1e3:.1f} ms)")
+
+        # 3. Unchanged content is detected and not republished
+        start = time.perf_counter()
+        changed = store.reload()
+        print(f"No-op reload:     {time.perf_counter() - start:.2f} s (published={changed})")
@@ -0,0 +1,37 @@
+import random
+import time
+
+from toxicity import run_safety_guardrails, run_safety_guardrails_batch
+
+OUTPUTS = [
+    "A Python class is defined using the 'class' keyword.",
+    "That is a terrible idea and you are stupid.",
+    "All doctors are men who specialize in surgery.",
+    "Contact me at 555-123-4567 for more details.",
+    "Decorators wrap a function to extend its behavior without modifying its source. "
+    "They are applied with the @ syntax directly above the function definition.",
+    "Use a LEFT JOIN when you need every row from the left table, even without a match on the right.",
+    "The capital of Australia is Canberra.",
+]
+
+def build_corpus(size: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [rng.choice(OUTPUTS) + f" (#{i})" for i in range(size)]
+
+if __name__ == "__main__":
+    corpus = build_corpus(512)
+
+    start = time.perf_counter()
+    sequential = [run_safety_guardrails(text) for text in corpus]
+    sequential_s = time.perf_counter() - start
+
+    print(f"--- Guardrail batch benchmark ({len(corpus)} outputs, CPU) ---")
+    print(f"{'batch size':>10} {'outputs/sec':>12} {'speedup':>8}")
+    print(f"{'1 (seq)':>10} {len(corpus) / sequential_s:>12.1f} {1.0:>8.2f}")
+    for batch_size in (4, 8, 16, 32, 64):
+        start = time.perf_counter()
+        batched = run_safety_guardrails_batch(corpus, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        # Padding can shift scores in the last decimals; verdicts must not change
+        assert [(v["PASS"], v["type"]) for v in batched] == [(v["PASS"], v["type"]) for v in sequential]
+        print(f"{batch_size:>10} {len(corpus) / elapsed:>12.1f} {sequential_s / elapsed:>8.2f}")
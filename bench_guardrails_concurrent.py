@@ -0,0 +1,30 @@
+import statistics
+import time
+
+from bench_guardrails_batch import build_corpus
+from toxicity import run_safety_guardrails, run_safety_guardrails_concurrent
+
+def latencies_ms(fn, corpus: list) -> list:
+    samples = []
+    for text in corpus:
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return sorted(samples)
+
+def percentile(samples: list, q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+if __name__ == "__main__":
+    corpus = build_corpus(300)
+
+    # Warm up every model before timing
+    run_safety_guardrails_concurrent(corpus[0])
+    assert all(run_safety_guardrails(t) == run_safety_guardrails_concurrent(t) for t in corpus[:20])
+
+    print(f"--- Guardrail latency: sequential vs concurrent ({len(corpus)} outputs) ---")
+    print(f"{'mode':<12} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for label, fn in (("sequential", run_safety_guardrails), ("concurrent", run_safety_guardrails_concurrent)):
+        samples = latencies_ms(fn, corpus)
+        print(f"{label:<12} {percentile(samples, 0.5):>8.2f} {percentile(samples, 0.99):>8.2f} "
+              f"{statistics.mean(samples):>8.2f}")
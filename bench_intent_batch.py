@@ -0,0 +1,29 @@
+import sys
+import time
+
+import purpose
+from purpose import TRAIN_DATA, check_query_intent, check_query_intents, load_intent_model
+
+def build_queries(n: int) -> list:
+    texts = [text for text, _ in TRAIN_DATA]
+    return [f"{texts[i % len(texts)]} (#{i})" for i in range(n)]
+
+if __name__ == "__main__":
+    if load_intent_model() is None:
+        sys.exit(f"Train the intent model first (expected at {purpose.INTENT_MODEL_PATH}).")
+
+    queries = build_queries(5_000)
+
+    start = time.perf_counter()
+    single = [check_query_intent(q) for q in queries]
+    single_rate = len(queries) / (time.perf_counter() - start)
+
+    print(f"--- Intent classification throughput ({len(queries)} queries) ---")
+    print(f"check_query_intent (per query):          {single_rate:9.1f} queries/sec")
+    for batch_size, n_process in ((64, 1), (256, 1), (1024, 1), (256, 2)):
+        start = time.perf_counter()
+        batched = check_query_intents(queries, batch_size=batch_size, n_process=n_process)
+        rate = len(queries) / (time.perf_counter() - start)
+        assert [label for label, _ in batched] == single
+        print(f"check_query_intents (batch={batch_size:<4}, n_process={n_process}): "
+              f"{rate:9.1f} queries/sec ({rate / single_rate:.1f}x)")
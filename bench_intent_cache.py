@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+import purpose
+from purpose import TRAIN_DATA, IntentCache, check_query_intent, load_intent_model
+
+def build_traffic(n: int, seed: int = 0) -> list:
+    """Skewed traffic: a few questions dominate, with case/spacing/punctuation variants."""
+    rng = random.Random(seed)
+    texts = [text for text, _ in TRAIN_DATA] + [f"{text} (variant {i})" for i in range(200) for text, _ in TRAIN_DATA[:1]]
+    weights = [1 / (rank + 1) for rank in range(len(texts))]
+    variants = (str, str.lower, str.upper, lambda t: "  " + t.replace(" ", "  "), lambda t: t.rstrip("?.") + "!!")
+    return [rng.choice(variants)(rng.choices(texts, weights)[0]) for _ in range(n)]
+
+if __name__ == "__main__":
+    if load_intent_model() is None:
+        sys.exit(f"Train the intent model first (expected at {purpose.INTENT_MODEL_PATH}).")
+
+    traffic = build_traffic(5_000)
+
+    start = time.perf_counter()
+    uncached = [check_query_intent(q) for q in traffic]
+    uncached_rate = len(traffic) / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "intent_cache.db")
+        cache = IntentCache(db_path=db_path)
+        start = time.perf_counter()
+        cached = [check_query_intent(q, cache) for q in traffic]
+        cached_rate = len(traffic) / (time.perf_counter() - start)
+        cache.close()
+        memory_stats = cache.stats
+
+        # A fresh process starts with an empty LRU but a warm disk tier
+        restarted = IntentCache(db_path=db_path)
+        start = time.perf_counter()
+        [check_query_intent(q, restarted) for q in traffic[:1_000]]
+        restart_rate = 1_000 / (time.perf_counter() - start)
+        restart_stats = restarted.stats
+        restarted.close()
+
+    # The model scores the normalized text the cache is keyed on, so caching never changes a label
+    mismatches = sum(a != b for a, b in zip(uncached, cached))
+    assert mismatches == 0, f"{mismatches} of {len(traffic)} labels differ between the cached and uncached paths"
+    print(f"--- Intent cache ({len(traffic)} queries, {len(set(traffic))} distinct raw strings) ---")
+    print(f"No cache:             {uncached_rate:9.1f} queries/sec")
+    print(f"IntentCache (memory): {cached_rate:9.1f} queries/sec ({cached_rate / uncached_rate:.1f}x), "
+          f"hit rate {memory_stats['hit_rate']:.1%}")
+    print(f"After restart (disk): {restart_rate:9.1f} queries/sec, hit rate {restart_stats['hit_rate']:.1%} "
+          f"({restart_stats['disk_hits']} disk hits)")
+    print(f"Labels identical to the uncached path for all {len(traffic)} queries.")
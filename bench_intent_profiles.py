@@ -0,0 +1,113 @@
+import json
+import os
+import random
+import sys
+import tempfile
+
+import spacy
+from thinc.api import Config
+
+from intent_data import (LATENCY_BUDGET_MS, TEXTCAT_PROFILES, build_docbins, evaluate_intent_model,
+                         textcat_architecture, train_intent_model, write_textcat_config)
+
+# Same training budget for every profile so only the architecture differs
+TRAIN_OVERRIDES = {"training.max_steps": 2_000, "training.max_epochs": 0}
+
+# Train and held-out sets use disjoint phrasings and subjects, so no held-out
+# sentence is a copy (or a numbered variant) of a training sentence.
+CODE_TEMPLATES = {
+    "train": ("How do I {task} in {lang}?", "Write a {lang} function to {task}.",
+              "What is the fastest way to {task} with {lang}?", "My {lang} code crashes when I {task}, why?",
+              "Explain how to {task} in {lang} step by step."),
+    "held_out": ("Can you show me {lang} code that will {task}?", "I need a {lang} snippet to {task}.",
+                 "Is there a {lang} library to {task}?", "Help me debug: trying to {task} in {lang} throws an exception."),
+}
+CODE_FILLERS = {
+    "train": {"task": ("reverse a string", "parse a JSON file", "sort a list of dicts", "read a CSV file",
+                       "connect to a PostgreSQL database", "merge two arrays", "handle a timeout error",
+                       "write a unit test", "remove duplicates from a list", "call a REST API"),
+              "lang": ("Python", "JavaScript", "Java", "Go", "C++")},
+    "held_out": {"task": ("validate an email address", "hash a password", "spawn a background thread",
+                          "stream a large file", "serialize an object to XML", "retry a failed HTTP request"),
+                 "lang": ("Rust", "TypeScript", "Kotlin", "Ruby")},
+}
+OFF_TOPIC_TEMPLATES = {
+    "train": ("What is the weather like in {place}?", "Tell me about the history of {topic}.",
+              "Where should I go for {thing} near {place}?", "What is a good recipe for {thing}?",
+              "Who won the last {topic} championship?"),
+    "held_out": ("Can you recommend a hotel in {place}?", "I want to learn more about {topic}, where do I start?",
+                 "How much does {thing} cost in {place}?", "Is {topic} popular these days?"),
+}
+OFF_TOPIC_FILLERS = {
+    "train": {"place": ("London", "Paris", "Tokyo", "Sydney", "Cairo"),
+              "topic": ("the Roman Empire", "football", "jazz", "the Olympics", "chess"),
+              "thing": ("apple pie", "a picnic", "sushi", "a summer vacation", "pancakes")},
+    "held_out": {"place": ("Lisbon", "Nairobi", "Toronto", "Seoul"),
+                 "topic": ("opera", "cricket", "ancient Egypt", "tennis"),
+                 "thing": ("a ski trip", "lasagna", "a wedding dress", "a concert ticket")},
+}
+
+def write_templated(path: str, n: int, split: str = "train", seed: int = 0) -> None:
+    """Writes n labeled rows (half CODE, half OFF_TOPIC) from the split's templates and fillers."""
+    rng = random.Random(f"{seed}-{split}")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            code = i % 2 == 0
+            templates = (CODE_TEMPLATES if code else OFF_TOPIC_TEMPLATES)[split]
+            fillers = (CODE_FILLERS if code else OFF_TOPIC_FILLERS)[split]
+            text = rng.choice(templates).format(**{slot: rng.choice(words) for slot, words in fillers.items()})
+            f.write(json.dumps({"text": text, "cats": {"CODE": float(code), "OFF_TOPIC": float(not code)}}) + "\n")
+
+def missing_vectors(config_path):
+    """Name of the static vectors a config needs but that are not installed, else None."""
+    vectors = Config().from_disk(config_path, interpolate=False)["paths"]["vectors"]
+    if vectors and not spacy.util.is_package(vectors) and not os.path.exists(vectors):
+        return vectors
+    return None
+
+if __name__ == "__main__":
+    # python bench_intent_profiles.py [train.jsonl held_out.jsonl]  (default: 20k / 4k templated rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 2:
+            train_path, held_out_path = sys.argv[1], sys.argv[2]
+        else:
+            train_path, held_out_path = os.path.join(tmp, "train.jsonl"), os.path.join(tmp, "held_out.jsonl")
+            write_templated(train_path, 20_000, "train")
+            write_templated(held_out_path, 4_000, "held_out")
+        # The train build keeps its own dev split for `spacy train`; every profile is scored on held_out
+        data_dir = os.path.join(tmp, "data")
+        manifest = build_docbins(train_path, data_dir)
+        held_out_dir = os.path.join(tmp, "held_out")
+        held_out = build_docbins(held_out_path, held_out_dir, dev_fraction=1.0)
+
+        configs = {profile: write_textcat_config(os.path.join(tmp, f"{profile}.cfg"), profile)
+                   for profile in TEXTCAT_PROFILES}
+        architectures = {profile: textcat_architecture(path) for profile, path in configs.items()}
+        for profile, model in architectures.items():
+            print(f"{profile:<10} {model['@architectures']}")
+        # Two profiles with the same textcat model would make the comparison meaningless
+        for profile, model in architectures.items():
+            twins = [other for other, m in architectures.items() if other != profile and m == model]
+            assert not twins, f"profile {profile!r} generates the same textcat model as {twins}"
+
+        results = []
+        for profile, config_path in configs.items():
+            vectors = missing_vectors(config_path)
+            if vectors:
+                print(f"Skipping {profile!r}: needs the {vectors!r} vectors (python -m spacy download {vectors})")
+                continue
+            output_dir = os.path.join(tmp, f"model_{profile}")
+            record = train_intent_model(config_path, data_dir, output_dir, overrides=TRAIN_OVERRIDES,
+                                        timings_log=None)
+            results.append((profile, record, evaluate_intent_model(record["model_path"], held_out_dir)))
+
+    print(f"\n--- Intent textcat profiles ({manifest['counts']['train']} train / "
+          f"{held_out['counts']['dev']} held-out, budget p99 <= {LATENCY_BUDGET_MS} ms) ---")
+    print(f"{'profile':<10} {'accuracy':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch docs/s':>13} {'train s':>8} {'budget':>7}")
+    for profile, record, metrics in results:
+        print(f"{profile:<10} {metrics['accuracy']:>9.3f} {metrics['p50_ms']:>8.3f} {metrics['p99_ms']:>8.3f} "
+              f"{metrics['batch_docs_per_sec']:>13.1f} {record['train_seconds']:>8.1f} "
+              f"{'ok' if metrics['within_budget'] else 'OVER':>7}")
+    over = [profile for profile, _, metrics in results if not metrics["within_budget"]]
+    if over:
+        print(f"\n⚠ Over the {LATENCY_BUDGET_MS} ms p99 budget, do not serve: {', '.join(over)}")
@@ -0,0 +1,40 @@
+import json
+import os
+import random
+import sys
+import tempfile
+
+from intent_data import build_docbins, train_intent_model
+from purpose import TRAIN_DATA
+
+SIZES = (1_000, 10_000, 100_000)
+
+def write_synthetic(path: str, n: int, seed: int = 0) -> None:
+    """Grows the inline examples into n labeled rows with numbered variants."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            text, annotations = TRAIN_DATA[i % len(TRAIN_DATA)]
+            suffix = rng.choice(("", " Please explain.", " Thanks!", " (urgent)"))
+            f.write(json.dumps({"text": f"{text}{suffix} #{i}", "cats": annotations["cats"]}) + "\n")
+
+if __name__ == "__main__":
+    # python bench_intent_training.py [config.cfg]  (training is skipped without a config)
+    config_path = sys.argv[1] if len(sys.argv) > 1 else None
+
+    print(f"{'examples':>9} {'build s':>8} {'rebuild':>8} {'train s':>8} {'infer docs/s':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            input_path = os.path.join(tmp, f"examples_{n}.jsonl")
+            data_dir = os.path.join(tmp, f"data_{n}")
+            write_synthetic(input_path, n)
+
+            manifest = build_docbins(input_path, data_dir)
+            again = build_docbins(input_path, data_dir)
+            assert again["skipped"] and again["dataset_hash"] == manifest["dataset_hash"]
+
+            train_s, infer_rate = "-", "-"
+            if config_path:
+                record = train_intent_model(config_path, data_dir, os.path.join(tmp, f"model_{n}"))
+                train_s, infer_rate = record["train_seconds"], record["inference_docs_per_sec"]
+            print(f"{n:>9} {manifest['build_seconds']:>8} {'skipped':>8} {train_s:>8} {infer_rate:>13}")
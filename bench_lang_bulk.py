@@ -0,0 +1,38 @@
+import filecmp
+import json
+import os
+import random
+import tempfile
+
+from lang import LANGUAGE_GATE, bulk_filter_languages
+
+SAMPLES = [
+    "Language detection is a very useful preprocessing step for LLM applications.",
+    "Ein, zwei, drei, vier. Die Katze schläft auf dem Sofa.",
+    "¿Dónde está la biblioteca más cercana a la estación?",
+    "Quelle est la meilleure façon d'apprendre la programmation?",
+    "How do I reverse a string in Python using slicing?",
+    "What is the Big O notation for bubble sort and why does it matter?",
+]
+
+if __name__ == "__main__":
+    rows = 20_000
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "queries.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for i in range(rows):
+                f.write(json.dumps({"id": i, "query": f"{rng.choice(SAMPLES)} #{i}"}, ensure_ascii=False) + "\n")
+
+        print(f"--- Bulk language filter benchmark ({rows} rows) ---")
+        single_path = os.path.join(tmp, "single.jsonl")
+        single = bulk_filter_languages(input_path, single_path, workers=1)
+
+        pool_path = os.path.join(tmp, "pool.jsonl")
+        # Start from a cold cache so the pool run does not reuse in-process results
+        LANGUAGE_GATE.clear_cache()
+        pool = bulk_filter_languages(input_path, pool_path, workers=max(2, os.cpu_count() or 1))
+
+        assert filecmp.cmp(single_path, pool_path, shallow=False), "Pool output differs from single-process output"
+        print(f"Outputs identical. Speedup: {pool['rows_per_sec'] / single['rows_per_sec']:.2f}x "
+              f"on {pool['workers']} workers")
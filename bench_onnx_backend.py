@@ -0,0 +1,77 @@
+import json
+import statistics
+import sys
+import time
+
+from toxicity import (
+    HARMFUL_LABELS,
+    TOXICITY_MODEL,
+    TOXICITY_THRESHOLD,
+    ZERO_SHOT_MODEL,
+    _toxicity_verdict,
+    build_classifier_pipeline,
+)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Fallback labeled sample; pass a JSONL file of {"text": ..., "toxic": true/false} for a real one
+DEFAULT_SAMPLE = [
+    {"text": "A Python class is defined using the 'class' keyword.", "toxic": False},
+    {"text": "Thanks, that explanation of decorators really helped!", "toxic": False},
+    {"text": "The capital of Australia is Canberra.", "toxic": False},
+    {"text": "Use a LEFT JOIN to keep all rows from the left table.", "toxic": False},
+    {"text": "That is a terrible idea and you are stupid.", "toxic": True},
+    {"text": "Shut up, nobody cares about your worthless opinion, idiot.", "toxic": True},
+    {"text": "You are a pathetic loser and everyone hates you.", "toxic": True},
+    {"text": "All doctors are men who specialize in surgery.", "toxic": False},
+]
+
+def load_sample(path: str = None) -> list:
+    if not path:
+        return DEFAULT_SAMPLE
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def timed(fn, items: list):
+    outputs, latencies = [], []
+    for item in items:
+        start = time.perf_counter()
+        outputs.append(fn(item))
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return outputs, statistics.median(latencies)
+
+if __name__ == "__main__":
+    sample = load_sample(sys.argv[1] if len(sys.argv) > 1 else None)
+    texts = [row["text"] for row in sample]
+
+    print(f"--- Toxicity backend parity ({TOXICITY_MODEL}, {len(texts)} labeled texts) ---")
+    print(f"{'backend':<10} {'load s':>7} {'p50 ms':>8} {'accuracy':>9} {'agree':>7} {'max |dscore|':>13}")
+    reference = None
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        classifier = build_classifier_pipeline("sentiment-analysis", TOXICITY_MODEL, backend)
+        load_s = time.perf_counter() - start
+        classifier(texts[0])  # warm up
+        verdicts, p50 = timed(lambda t: _toxicity_verdict(classifier(t)[0], TOXICITY_THRESHOLD), texts)
+        accuracy = statistics.mean(v["is_toxic"] == row["toxic"] for v, row in zip(verdicts, sample))
+        reference = reference or verdicts
+        agree = statistics.mean(v["is_toxic"] == r["is_toxic"] for v, r in zip(verdicts, reference))
+        drift = max(abs(v["score"] - r["score"]) for v, r in zip(verdicts, reference))
+        print(f"{backend:<10} {load_s:>7.1f} {p50:>8.2f} {accuracy:>9.1%} {agree:>7.1%} {drift:>13.4f}")
+
+    print(f"\n--- Zero-shot backend parity ({ZERO_SHOT_MODEL}, {len(HARMFUL_LABELS)} labels) ---")
+    print(f"{'backend':<10} {'load s':>7} {'p50 ms':>8} {'top agree':>10} {'max |dscore|':>13}")
+    reference = None
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        zero_shot = build_classifier_pipeline("zero-shot-classification", ZERO_SHOT_MODEL, backend)
+        load_s = time.perf_counter() - start
+        zero_shot(texts[0], HARMFUL_LABELS, multi_label=True)  # warm up
+        results, p50 = timed(lambda t: zero_shot(t, HARMFUL_LABELS, multi_label=True), texts)
+        scores = [dict(zip(r["labels"], r["scores"])) for r in results]
+        reference = reference or scores
+        top_agree = statistics.mean(
+            max(s, key=s.get) == max(r, key=r.get) for s, r in zip(scores, reference)
+        )
+        drift = max(abs(s[label] - r[label]) for s, r in zip(scores, reference) for label in HARMFUL_LABELS)
+        print(f"{backend:<10} {load_s:>7.1f} {p50:>8.2f} {top_agree:>10.1%} {drift:>13.4f}")
@@ -0,0 +1,36 @@
+import json
+import time
+
+from persona import PERSONA_PROMPTS, PERSONA_REGISTRY
+
+def original_messages(user_query: str, selected_persona: str) -> list:
+    # What generate_persona_response used to build on every call
+    system_instruction = PERSONA_PROMPTS.get(selected_persona, PERSONA_PROMPTS["Default"])
+    return [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": user_query},
+    ]
+
+def time_it(label: str, fn, n: int, repeats: int = 5) -> None:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<45} {best / n * 1e9:8.0f} ns/request")
+
+if __name__ == "__main__":
+    n = 200_000
+    queries = [f"Explain the concept of quantum entanglement, part {i}." for i in range(n)]
+    persona = "Academic"
+
+    # Same payload either way
+    assert PERSONA_REGISTRY.messages_for(queries[0], persona) == original_messages(queries[0], persona)
+    assert json.loads(PERSONA_REGISTRY.serialize_messages(queries[0], persona)) == original_messages(queries[0], persona)
+
+    print(f"--- Persona message construction ({n} requests) ---")
+    time_it("original dict build", lambda: [original_messages(q, persona) for q in queries], n)
+    time_it("registry.messages_for", lambda: [PERSONA_REGISTRY.messages_for(q, persona) for q in queries], n)
+    time_it("registry.messages_for_many (batch)", lambda: PERSONA_REGISTRY.messages_for_many(queries, persona), n)
+    time_it("original + json.dumps", lambda: [json.dumps(original_messages(q, persona), ensure_ascii=False, separators=(",", ":")) for q in queries], n)
+    time_it("registry.serialize_messages", lambda: [PERSONA_REGISTRY.serialize_messages(q, persona) for q in queries], n)
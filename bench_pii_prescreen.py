@@ -0,0 +1,67 @@
+import random
+import time
+
+from presidio import TieredPIIChecker, get_pii_engine
+
+ENTITIES = ["EMAIL_ADDRESS", "PHONE_NUMBER", "US_SSN"]
+
+# Typical LLM outputs: mostly clean prose and code, some numbers, a little real PII
+CLEAN_OUTPUTS = [
+    "A Python class is defined using the 'class' keyword.",
+    "Decorators wrap a function to extend its behavior without modifying it.",
+    "The capital of Australia is Canberra, not Sydney.",
+    "Use a LEFT JOIN when you need all rows from the left table.",
+    "Bubble sort has a worst-case time complexity of O(n^2).",
+    "The Roman Empire reached its greatest extent under Trajan in 117 AD.",
+    "In 2024 the release cadence moved to one version per year.",
+    "Step 1: install the package. Step 2: run the tests.",
+]
+NUMERIC_OUTPUTS = [
+    "The order total was 12345 units across 3 warehouses.",
+    "Version 3.11.7 fixed the regression reported in issue 10452.",
+]
+PII_OUTPUTS = [
+    "Contact me at 555-123-4567 for more details.",
+    "You can reach the team at support@example.com.",
+    "His SSN is 078-05-1120, please keep it private.",
+]
+
+def build_corpus(size: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        pool = CLEAN_OUTPUTS if roll < 0.85 else NUMERIC_OUTPUTS if roll < 0.95 else PII_OUTPUTS
+        corpus.append(rng.choice(pool))
+    return corpus
+
+def spans(results) -> list:
+    return sorted((r.entity_type, r.start, r.end) for r in results)
+
+if __name__ == "__main__":
+    engine = get_pii_engine()
+    engine.warmup()
+    corpus = build_corpus(5_000)
+
+    start = time.perf_counter()
+    full = [engine.analyze(text, entities=ENTITIES) for text in corpus]
+    full_s = time.perf_counter() - start
+
+    checker = TieredPIIChecker(ENTITIES, engine=engine)
+    start = time.perf_counter()
+    tiered = [checker.analyze(text) for text in corpus]
+    tiered_s = time.perf_counter() - start
+
+    batch_checker = TieredPIIChecker(ENTITIES, engine=engine)
+    start = time.perf_counter()
+    tiered_batch = batch_checker.analyze_many(corpus)
+    batch_s = time.perf_counter() - start
+
+    assert [spans(r) for r in full] == [spans(r) for r in tiered] == [spans(r) for r in tiered_batch]
+
+    print(f"--- Tiered PII check benchmark ({len(corpus)} texts) ---")
+    print(f"Full analyzer:          {full_s / len(corpus) * 1e3:8.3f} ms/text")
+    print(f"Tiered (per text):      {tiered_s / len(corpus) * 1e3:8.3f} ms/text  ({full_s / tiered_s:.1f}x)")
+    print(f"Tiered (batched):       {batch_s / len(corpus) * 1e3:8.3f} ms/text  ({full_s / batch_s:.1f}x)")
+    print(f"Short-circuited:        {checker.stats['short_circuited']} of {checker.stats['checked']} "
+          f"({checker.stats['short_circuit_rate']:.1%})")
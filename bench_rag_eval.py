@@ -0,0 +1,65 @@
+import hashlib
+import random
+import time
+
+import numpy as np
+
+import rag_eval
+from rag_eval import evaluate_rag_output, evaluate_rag_outputs
+
+DIM = 384
+CALL_OVERHEAD = 0.001  # simulated per-request cost of an embedding API / model call
+
+def _hashed_vector(text: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    return np.random.default_rng(seed).standard_normal(DIM)
+
+def embed_one(text: str) -> list:
+    time.sleep(CALL_OVERHEAD)
+    return _hashed_vector(text).tolist()
+
+def embed_many(texts: list) -> list:
+    time.sleep(CALL_OVERHEAD)
+    return [_hashed_vector(text) for text in texts]
+
+def build_samples(n: int, seed: int = 0) -> list:
+    """Queries share a pool of retrieved chunks, as in a real eval set."""
+    rng = random.Random(seed)
+    chunks = [f"Chunk {i} about topic {i % 50}." for i in range(500)]
+    return [
+        (f"Question {i % 300}?", rng.sample(chunks, rng.randint(0, 6)), f"Answer {i} citing topic {i % 50}.")
+        for i in range(n)
+    ]
+
+if __name__ == "__main__":
+    samples = build_samples(1_000)
+    rag_eval.get_embedding = embed_one  # what evaluate_rag_output calls per text
+
+    start = time.perf_counter()
+    looped = [evaluate_rag_output(query, chunks, answer) for query, chunks, answer in samples]
+    looped_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = evaluate_rag_outputs(samples, embed_batch=embed_many)
+    batched_seconds = time.perf_counter() - start
+
+    for key in ("query_answer_similarity", "context_answer_similarity", "context_precision"):
+        assert np.allclose([r[key] for r in looped], [r[key] for r in batched], rtol=0, atol=1e-12), key
+    print(f"Parity check passed on {len(samples)} samples (max |diff| <= 1e-12)")
+
+    print(f"--- RAG evaluation, {len(samples)} samples, {DIM}-d embeddings, "
+          f"{CALL_OVERHEAD * 1000:.0f} ms per embedding call ---")
+    print(f"evaluate_rag_output (loop):    {looped_seconds:7.2f} s")
+    print(f"evaluate_rag_outputs (batch):  {batched_seconds:7.2f} s ({looped_seconds / batched_seconds:.0f}x)")
+
+
+    # Same comparison with free embedding calls: the NumPy scoring alone
+    CALL_OVERHEAD = 0.0
+    start = time.perf_counter()
+    [evaluate_rag_output(query, chunks, answer) for query, chunks, answer in samples]
+    looped_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluate_rag_outputs(samples, embed_batch=embed_many)
+    batched_seconds = time.perf_counter() - start
+    print(f"\nWithout call overhead: loop {looped_seconds:.2f} s, batch {batched_seconds:.2f} s "
+          f"({looped_seconds / batched_seconds:.1f}x)")
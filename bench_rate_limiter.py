@@ -0,0 +1,44 @@
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from bench_moderation_client import QUERIES
+from safety import AsyncModerationClient, RateLimiter
+from stub_moderation_server import StubModerationServer
+
+QUOTA_REQUESTS = 20   # per window, enforced by the stub
+QUOTA_WINDOW = 1.0    # seconds (a scaled-down "per minute" quota)
+
+async def burst(client: AsyncModerationClient, queries: list) -> list:
+    async with client:
+        return await client.moderate_many(queries)
+
+def run(label: str, queries: list, **client_kwargs) -> None:
+    with StubModerationServer(latency=0.01, quota_requests=QUOTA_REQUESTS, quota_window=QUOTA_WINDOW) as stub:
+        client = AsyncModerationClient(api_url=stub.url, api_key="stub", max_concurrency=64,
+                                       max_retries=6, base_backoff=0.25, **client_kwargs)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # the client logs every final 429
+            responses = asyncio.run(burst(client, queries))
+        elapsed = time.perf_counter() - start
+        failed = sum(response is None for response in responses)
+        print(f"{label:<28} {stub.requests:>9} {stub.rejected:>6} {client.coalesced:>10} {failed:>7} {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    # Bursty traffic: 300 queries arriving at once, only 40 distinct (retries, templated questions)
+    rng = random.Random(42)
+    distinct = [f"{QUERIES[i % len(QUERIES)]} (#{i})" for i in range(40)]
+    queries = [rng.choice(distinct) for _ in range(300)]
+
+    # Budget slightly under the quota so clock skew never trips it
+    per_minute = QUOTA_REQUESTS / QUOTA_WINDOW * 60 * 0.95
+
+    print(f"--- Burst of {len(queries)} queries ({len(set(queries))} distinct), "
+          f"quota {QUOTA_REQUESTS} req / {QUOTA_WINDOW:.0f}s ---")
+    print(f"{'mode':<28} {'upstream':>9} {'429s':>6} {'coalesced':>10} {'failed':>7} {'seconds':>8}")
+    run("no limiter, no coalescing", queries, coalesce=False)
+    run("coalescing only", queries, coalesce=True)
+    run("limiter + coalescing", queries, coalesce=True,
+        rate_limiter=RateLimiter(requests_per_minute=per_minute, tokens_per_minute=1_000_000))
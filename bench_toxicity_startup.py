@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import toxicity; print(time.perf_counter() - start)"
+
+def import_seconds(repeats: int = 5) -> float:
+    # Fresh interpreter each time, so nothing is cached in sys.modules
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return min(samples)
+
+if __name__ == "__main__":
+    print("--- toxicity.py startup benchmark ---")
+    print(f"import toxicity:        {import_seconds() * 1e3:8.1f} ms")
+
+    import toxicity
+
+    start = time.perf_counter()
+    load_times = toxicity.warmup_guardrails()
+    print(f"warmup_guardrails():    {time.perf_counter() - start:8.2f} s")
+    for name, seconds in load_times.items():
+        print(f"  {name:<20} {seconds:8.2f} s")
+    if toxicity.GUARDRAILS.disabled:
+        print(f"  disabled: {', '.join(sorted(toxicity.GUARDRAILS.disabled))}")
@@ -0,0 +1,24 @@
+import time
+
+from bench_guardrails_batch import build_corpus
+from toxicity import GUARDRAILS, HARMFUL_LABELS, score_harmful_labels_batch
+
+if __name__ == "__main__":
+    corpus = build_corpus(64)
+    zero_shot = GUARDRAILS.get("zero_shot")
+
+    start = time.perf_counter()
+    reference = [zero_shot(text, HARMFUL_LABELS, multi_label=True) for text in corpus]
+    pipeline_s = time.perf_counter() - start
+    reference = [dict(zip(r["labels"], r["scores"])) for r in reference]
+
+    score_harmful_labels_batch(corpus[:2])  # builds the scorer (hypotheses tokenized once)
+    start = time.perf_counter()
+    batched = score_harmful_labels_batch(corpus)
+    batched_s = time.perf_counter() - start
+
+    drift = max(abs(b[label] - r[label]) for b, r in zip(batched, reference) for label in HARMFUL_LABELS)
+    print(f"--- Zero-shot bias scoring ({len(corpus)} outputs x {len(HARMFUL_LABELS)} labels) ---")
+    print(f"pipeline per text:  {len(corpus) / pipeline_s:8.1f} outputs/sec")
+    print(f"packed NLI batches: {len(corpus) / batched_s:8.1f} outputs/sec ({pipeline_s / batched_s:.1f}x)")
+    print(f"max |score diff| vs pipeline: {drift:.2e}")
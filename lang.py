@@ -1,60 +1,241 @@
-from langdetect import detect
 from langdetect import detect_langs # For probabilities
 
 def check_language(text: str):
-    try:
-        # Detect the single most probable language
-        detected_code = detect(text)
-        print(f"Detected Language Code: {detected_code}") 
-        
-        # Detect all probable languages with their confidence scores
-        probable_langs = detect_langs(text)
-        print(f"Probabilities: {probable_langs}")
-
-    except Exception as e:
-        # This handles errors, typically raised if the text is too short or empty
-        print(f"Error: Could not detect language. Reason: {e}")
-        detected_code = 'unknown'
-        
-    return detected_code
+    # Single detection pass: the top language and the probabilities come from the same run
+    result = LANGUAGE_GATE.detect(text)
 
-# --- Test Cases ---
-english_text = "Language detection is a very useful preprocessing step for LLM applications."
-german_text = "Ein, zwei, drei, vier. Die Katze schläft."
-short_text = "XYZ"
-
-print("--- English Test ---")
-check_language(english_text)
-
-print("\n--- German Test ---")
-check_language(german_text)
+    if result.lang == 'unknown':
+        # Typically the text is too short or empty
+        print("Error: Could not detect language. Reason: no detectable language features.")
+        return 'unknown'
 
-print("\n--- Short Text Test ---")
-check_language(short_text)
+    print(f"Detected Language Code: {result.lang}")
+    print(f"Probabilities: {list(result.probabilities)}")
+    return result.lang
 
 ##########################################
 
-from langdetect import detect
+import functools
+from typing import Iterable, List, NamedTuple, Tuple
+
+from langdetect import DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
 
 TARGET_LANGUAGE = 'en'
 FALLBACK_RESPONSE = "I am a specialized assistant trained only to process questions in English. Please translate your query and try again."
 
+class LanguageResult(NamedTuple):
+    lang: str                                  # Top language code, or 'unknown'
+    probabilities: Tuple[Tuple[str, float], ...]  # (code, probability), most probable first
+    source: str                                # 'fast_path', 'detector' or 'error'
+
+# Function words that are common in English questions and are not words of
+# other Latin-script languages (so no "is"/"de"/"do"/"to"/"of"/"has", nor
+# "are", Romanian for "has", or "my", Polish/Czech for "we").
+ENGLISH_STOPWORDS = frozenset((
+    "the", "what", "how", "why", "who", "which", "does", "can", "you", "your",
+    "this", "that", "and", "with", "where", "when", "should", "would", "could",
+    "there", "have", "it", "please",
+))
+
+class LanguageGate:
+    """
+    Cached, deterministic language gate.
+
+    Runs langdetect once per distinct (whitespace-normalized) text and keeps
+    the result in a bounded LRU cache. Short ASCII-only queries that contain
+    an English function word (ENGLISH_STOPWORDS) are accepted as English
+    without running the probabilistic detector, which is unreliable on very
+    short inputs anyway; other short ASCII text (e.g. Spanish or German
+    without accents) still goes to the detector. The fast path only applies
+    when the target language is English.
+    """
+
+    def __init__(self, target_language: str = TARGET_LANGUAGE, cache_size: int = 100_000,
+                 ascii_fast_path_max_len: int = 40, seed: int = 0):
+        self.target_language = target_language
+        self.ascii_fast_path_max_len = ascii_fast_path_max_len
+        # langdetect samples randomly; a fixed seed makes repeated calls return the same result
+        DetectorFactory.seed = seed
+        self._detect_cached = functools.lru_cache(maxsize=cache_size)(self._detect_normalized)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def _looks_english(self, text: str) -> bool:
+        if self.target_language != 'en' or not text.isascii() or len(text) > self.ascii_fast_path_max_len:
+            return False
+        words = "".join(ch if ch.isalpha() else " " for ch in text.lower()).split()
+        return any(word in ENGLISH_STOPWORDS for word in words)
+
+    def _detect_normalized(self, text: str) -> LanguageResult:
+        if self._looks_english(text):
+            return LanguageResult(self.target_language, ((self.target_language, 1.0),), 'fast_path')
+        try:
+            langs = detect_langs(text)
+        except LangDetectException:
+            return LanguageResult('unknown', (), 'error')
+        if not langs:
+            # Every candidate was below langdetect's probability cutoff (its detect() says 'unknown' too)
+            return LanguageResult('unknown', (), 'detector')
+        probabilities = tuple((lang.lang, lang.prob) for lang in langs)
+        return LanguageResult(probabilities[0][0], probabilities, 'detector')
+
+    def detect(self, text: str) -> LanguageResult:
+        """Detects the language of one text (top code plus all probabilities)."""
+        return self._detect_cached(self.normalize(text))
+
+    def detect_many(self, texts: Iterable[str]) -> List[LanguageResult]:
+        """Batch version of detect; repeated texts in the batch are detected once."""
+        return [self.detect(text) for text in texts]
+
+    def is_target_language(self, text: str) -> bool:
+        return self.detect(text).lang == self.target_language
+
+    def cache_info(self):
+        return self._detect_cached.cache_info()
+
+    def clear_cache(self) -> None:
+        self._detect_cached.cache_clear()
+
+LANGUAGE_GATE = LanguageGate()
+
 def process_query_safely(cleaned_query: str):
-    try:
-        # 1. Check Language
-        detected_lang = detect(cleaned_query)
-        
-        if detected_lang != TARGET_LANGUAGE:
-            print(f"🛑 Query blocked. Detected language: {detected_lang}")
-            return FALLBACK_RESPONSE
-        
-        # 2. Proceed with English Query (Your main logic)
-        return call_main_llm(cleaned_query) # Call your main LLM or spaCy Intent Checker
-        
-    except LangDetectException:
+    # 1. Check Language (cached, single detection pass)
+    result = LANGUAGE_GATE.detect(cleaned_query)
+
+    if result.lang == 'unknown':
         # Handle inputs too short or ambiguous (e.g., "???", "hello")
         print("⚠️ Query blocked. Language detection failed (too short/ambiguous).")
         return FALLBACK_RESPONSE
 
-# (Assuming call_main_llm is defined elsewhere)
\ No newline at end of file
+    if result.lang != TARGET_LANGUAGE:
+        print(f"🛑 Query blocked. Detected language: {result.lang}")
+        return FALLBACK_RESPONSE
+
+    # 2. Proceed with English Query (Your main logic)
+    return call_main_llm(cleaned_query) # Call your main LLM or spaCy Intent Checker
+
+# (Assuming call_main_llm is defined elsewhere)
+
+##########################################
+
+# --- Bulk Offline Filtering (Process Pool) ---
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, Optional
+
+def classify_query_language(cleaned_query: str) -> dict:
+    """The language verdict process_query_safely acts on, without the LLM call."""
+    result = LANGUAGE_GATE.detect(cleaned_query)
+    return {"lang": result.lang, "allowed": result.lang == TARGET_LANGUAGE}
+
+def _classify_chunk(texts: List[str]):
+    # Runs inside a worker process; LANGUAGE_GATE (and its fixed seed) is set up on import
+    start = time.perf_counter()
+    verdicts = [classify_query_language(text) for text in texts]
+    return verdicts, time.perf_counter() - start, os.getpid()
+
+def _iter_records(input_path: str, text_field: str) -> Iterator[Dict]:
+    """Yields one dict per row: JSONL rows as-is, plain lines as {text_field: line}."""
+    is_jsonl = input_path.endswith((".jsonl", ".ndjson"))
+    with open(input_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            yield json.loads(line) if is_jsonl else {text_field: line}
+
+def bulk_filter_languages(input_path: str, output_path: str, workers: Optional[int] = None,
+                          chunk_size: int = 5_000, text_field: str = "query") -> dict:
+    """
+    Runs the process_query_safely language gate over a JSONL or plain-text file.
+
+    Rows are sharded into chunks across a process pool and written to
+    output_path as JSONL (the input record plus "lang" and "allowed") in
+    input order, so the output is identical to a single-process run.
+    At most two chunks per worker are in flight, so memory stays bounded.
+
+    Returns:
+        Throughput stats: total rows, wall time, rows/sec overall and per worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    records = _iter_records(input_path, text_field)
+    busy_time: Dict[int, float] = {}
+    rows_by_worker: Dict[int, int] = {}
+    total_rows = 0
+    start = time.perf_counter()
+
+    def _write(out, chunk, verdicts):
+        for record, verdict in zip(chunk, verdicts):
+            record.update(verdict)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _account(elapsed, pid, rows):
+        busy_time[pid] = busy_time.get(pid, 0.0) + elapsed
+        rows_by_worker[pid] = rows_by_worker.get(pid, 0) + rows
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        if workers == 1:
+            # Single-process reference path (no pickling overhead)
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                verdicts, elapsed, pid = _classify_chunk([r.get(text_field, "") for r in chunk])
+                _account(elapsed, pid, len(chunk))
+                _write(out, chunk, verdicts)
+                total_rows += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = deque()
+                while True:
+                    chunk = list(islice(records, chunk_size))
+                    if chunk:
+                        texts = [r.get(text_field, "") for r in chunk]
+                        in_flight.append((chunk, executor.submit(_classify_chunk, texts)))
+                    # Drain in submission order once the pipeline is full (or the input is exhausted)
+                    while in_flight and (not chunk or len(in_flight) >= 2 * workers):
+                        done_chunk, future = in_flight.popleft()
+                        verdicts, elapsed, pid = future.result()
+                        _account(elapsed, pid, len(done_chunk))
+                        _write(out, done_chunk, verdicts)
+                        total_rows += len(done_chunk)
+                    if not chunk:
+                        break
+
+    wall_time = time.perf_counter() - start
+    per_worker = {pid: rows_by_worker[pid] / busy_time[pid] if busy_time[pid] else 0.0 for pid in busy_time}
+    stats = {
+        "rows": total_rows,
+        "workers": workers,
+        "wall_seconds": wall_time,
+        "rows_per_sec": total_rows / wall_time if wall_time else 0.0,
+        "rows_per_sec_per_worker": per_worker,
+    }
+    print(f"✅ Language-filtered {total_rows} rows with {workers} worker(s) in {wall_time:.1f}s "
+          f"({stats['rows_per_sec']:.0f} rows/sec).")
+    for pid, rate in per_worker.items():
+        print(f"   worker {pid}: {rows_by_worker[pid]} rows, {rate:.0f} rows/sec")
+    return stats
+
+# --- Test Cases ---
+if __name__ == "__main__":
+    english_text = "Language detection is a very useful preprocessing step for LLM applications."
+    german_text = "Ein, zwei, drei, vier. Die Katze schläft."
+    short_text = "XYZ"
+
+    print("--- English Test ---")
+    check_language(english_text)
+
+    print("\n--- German Test ---")
+    check_language(german_text)
+
+    print("\n--- Short Text Test ---")
+    check_language(short_text)
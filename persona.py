@@ -1,3 +1,7 @@
+import hashlib
+import json
+from typing import Dict, List, NamedTuple
+
 PERSONA_PROMPTS = {
     "Sassy": "You are a **sassy, witty, and slightly sarcastic** assistant. Your responses must be brief, sharp, and use modern slang where appropriate. Do not apologize for your attitude.",
     "Academic": "You are a **highly knowledgeable and formal university professor**. Your responses must be structured, use sophisticated vocabulary, cite theoretical concepts, and maintain a serious, scholarly tone.",
@@ -5,6 +9,59 @@ PERSONA_PROMPTS = {
     "Default": "You are a helpful and neutral AI assistant."
 }
 
+class PersonaPrompt(NamedTuple):
+    name: str
+    system_instruction: str
+    # Serialized prefix (JSON array without the closing bracket). Byte-identical on every
+    # request, which is what provider-side prompt caching keys on.
+    prefix_json: str
+    # Stable per-persona key (e.g. for OpenAI's prompt_cache_key or cache metrics)
+    cache_key: str
+
+class PersonaRegistry:
+    """
+    Pre-builds the message prefix for each persona once.
+
+    Per request, only the user message is serialized; the system prompt is
+    never re-escaped. The messages arrays are built from plain strings, so
+    every request gets fresh dicts and no caller can alter the cached prompt.
+    """
+
+    def __init__(self, prompts: Dict[str, str] = PERSONA_PROMPTS, default: str = "Default"):
+        self.default = default
+        self._personas: Dict[str, PersonaPrompt] = {}
+        for name, instruction in prompts.items():
+            self.register(name, instruction)
+
+    def register(self, name: str, system_instruction: str) -> PersonaPrompt:
+        system_message = {"role": "system", "content": system_instruction}
+        prefix_json = json.dumps([system_message], ensure_ascii=False, separators=(",", ":"))[:-1]
+        cache_key = "persona-" + hashlib.sha256(prefix_json.encode("utf-8")).hexdigest()[:16]
+        persona = PersonaPrompt(name, system_instruction, prefix_json, cache_key)
+        self._personas[name] = persona
+        return persona
+
+    def get(self, selected_persona: str) -> PersonaPrompt:
+        return self._personas.get(selected_persona) or self._personas[self.default]
+
+    def messages_for(self, user_query: str, selected_persona: str = "Default") -> List[dict]:
+        """Builds the messages array (Standard Chat API format) from the cached system prompt."""
+        persona = self._personas.get(selected_persona) or self._personas[self.default]
+        return [{"role": "system", "content": persona.system_instruction}, {"role": "user", "content": user_query}]
+
+    def serialize_messages(self, user_query: str, selected_persona: str = "Default") -> str:
+        """Returns the messages array as JSON; only the user message is serialized per call."""
+        user_json = json.dumps({"role": "user", "content": user_query}, ensure_ascii=False, separators=(",", ":"))
+        return f"{self.get(selected_persona).prefix_json},{user_json}]"
+
+    def messages_for_many(self, user_queries: List[str], selected_persona: str = "Default") -> List[List[dict]]:
+        """Batch version of messages_for: many user queries sharing one persona."""
+        system_instruction = self.get(selected_persona).system_instruction
+        return [[{"role": "system", "content": system_instruction}, {"role": "user", "content": query}]
+                for query in user_queries]
+
+PERSONA_REGISTRY = PersonaRegistry()
+
 def generate_persona_response(user_query: str, selected_persona: str = "Default") -> str:
     """
     Constructs the model input using a dynamic System Prompt (Persona).
@@ -17,38 +74,37 @@ def generate_persona_response(user_query: str, selected_persona: str = "Default"
         The generated response text from the LLM.
     """
     
-    # 1. Retrieve the System Prompt based on the user's choice
-    system_instruction = PERSONA_PROMPTS.get(selected_persona, PERSONA_PROMPTS["Default"])
-    
-    # 2. Build the messages array (Standard Chat API format)
-    messages = [
-        # The System message sets the role/persona for the entire conversation
-        {"role": "system", "content": system_instruction},
-        # The User's actual question
-        {"role": "user", "content": user_query}
-    ]
-    
-    # --- 3. Conceptual LLM API Call ---
+    # --- Conceptual LLM API Call ---
     # NOTE: You would replace this with your actual LLM client code (e.g., OpenAI, Gemini)
     
     # Example using a mock client:
+    # 1 & 2. Look up the cached persona and build the messages array with the user's question
+    # persona = PERSONA_REGISTRY.get(selected_persona)
+    # messages = PERSONA_REGISTRY.messages_for(user_query, persona.name)
+    # 3. Call the model
     # client = LLMClient() 
-    # response = client.generate(messages=messages)
+    # response = client.generate(messages=messages, prompt_cache_key=persona.cache_key)
     # return response.content
     
-    # Mocking the final input to show the construction:
-    print(f"--- Input for '{selected_persona}' Persona ---")
-    print(f"SYSTEM: {system_instruction}")
-    print(f"USER: {user_query}")
-    
     return f"Response generated with the '{selected_persona}' persona instruction."
 
+def generate_persona_responses(user_queries: List[str], selected_persona: str = "Default") -> List[str]:
+    """Batch version of generate_persona_response for many queries sharing one persona."""
+    persona = PERSONA_REGISTRY.get(selected_persona)
+    batch_messages = PERSONA_REGISTRY.messages_for_many(user_queries, persona.name)
+    
+    # client.generate_batch(batch_messages, prompt_cache_key=persona.cache_key)
+    return [f"Response generated with the '{selected_persona}' persona instruction." for _ in batch_messages]
+
 
 # --- Example Usage ---
-user_question = "Explain the concept of quantum entanglement."
-
-# Example 1: Sassy Persona
-generate_persona_response(user_question, selected_persona="Sassy")
+if __name__ == "__main__":
+    user_question = "Explain the concept of quantum entanglement."
 
-# Example 2: Academic Persona
-generate_persona_response(user_question, selected_persona="Academic")
\ No newline at end of file
+    for persona_name in ("Sassy", "Academic"):
+        # Mocking the final input to show the construction:
+        persona = PERSONA_REGISTRY.get(persona_name)
+        print(f"--- Input for '{persona_name}' Persona (cache key {persona.cache_key}) ---")
+        print(f"SYSTEM: {persona.system_instruction}")
+        print(f"USER: {user_question}")
+        print(generate_persona_response(user_question, selected_persona=persona_name))
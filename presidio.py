@@ -1,38 +1,488 @@
-from presidio_analyzer import AnalyzerEngine
+import hashlib
+import hmac
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from presidio_analyzer import AnalyzerEngine, RecognizerResult
 from presidio_anonymizer import AnonymizerEngine
 from presidio_anonymizer.entities import OperatorConfig
 
-# 1. Initialize the engines
-analyzer = AnalyzerEngine()
-anonymizer = AnonymizerEngine()
-
-# The text containing PII
-text_to_anonymize = "My name is George Washington, and my email is g.washington@usa.gov. My phone number is 212-555-5555."
-
-# 2. Analyze the text to find PII entities
-analyzer_results = analyzer.analyze(
-    text=text_to_anonymize,
-    language='en'
-)
-
-# 3. Define the Anonymization Operators (how to anonymize each entity)
+# Default Anonymization Operators (how to anonymize each entity)
 # Mask PHONE_NUMBER, Redact EMAIL_ADDRESS, and replace everything else (DEFAULT)
-operators = {
+DEFAULT_OPERATORS = {
     "PHONE_NUMBER": OperatorConfig("mask", {"masking_char": "*", "chars_to_mask": 4, "from_end": True}),
     "EMAIL_ADDRESS": OperatorConfig("redact"),
     "DEFAULT": OperatorConfig("replace", {"new_value": "<ANONYMIZED_ENTITY>"})
 }
 
-# 4. Anonymize the text using the analyzer results and defined operators
-anonymized_results = anonymizer.anonymize(
-    text=text_to_anonymize,
-    analyzer_results=analyzer_results,
-    operators=operators
-)
+def operators_key(operators: Dict[str, OperatorConfig]) -> str:
+    """Short hash of an operator config; replacements made under different configs never mix."""
+    spec = {entity: [getattr(config, "operator_name", None), getattr(config, "params", None)]
+            for entity, config in operators.items()}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+# Secret for PseudonymCache digests; required when the mapping is persisted
+PSEUDONYM_KEY_ENV = "PSEUDONYM_CACHE_KEY"
+
+class PseudonymCache:
+    """
+    Bounded (operators, entity_type, original value) -> replacement cache.
+
+    Used for consistent pseudonymization: once a value has been replaced,
+    every later occurrence gets the identical replacement without running
+    the operator again. With db_path set, the mapping is also written to a
+    local SQLite file, so a resumed batch job keeps producing the same
+    replacements (and evicted entries are reloaded from disk). Keys include
+    operators_key() of the operator config, so one cache (or file) can be
+    shared by callers with different operators without serving stale values.
+
+    Original values are never stored, in memory or on disk: entries are
+    keyed on an HMAC-SHA256 of the value under secret_key (default: the
+    PSEUDONYM_CACHE_KEY environment variable). A persisted file is only
+    reusable with the same key. Without db_path and without a key, a random
+    per-process key is used.
+    """
+
+    def __init__(self, maxsize: int = 100_000, db_path: Optional[str] = None, commit_every: int = 1_000,
+                 secret_key: Optional[bytes] = None):
+        if secret_key is None and os.environ.get(PSEUDONYM_KEY_ENV):
+            secret_key = os.environ[PSEUDONYM_KEY_ENV].encode("utf-8")
+        if secret_key is None:
+            if db_path is not None:
+                raise ValueError(f"A persisted PseudonymCache needs secret_key or ${PSEUDONYM_KEY_ENV}.")
+            secret_key = os.urandom(32)
+        self._secret_key = secret_key
+        self.maxsize = maxsize
+        self.commit_every = commit_every
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            # Files written before digests were used hold original values in clear
+            self._db.execute("DROP TABLE IF EXISTS pseudonyms")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pseudonym_digests ("
+                "operators TEXT NOT NULL, entity_type TEXT NOT NULL, original_hmac TEXT NOT NULL, "
+                "replacement TEXT NOT NULL, PRIMARY KEY (operators, entity_type, original_hmac))"
+            )
+            self._db.commit()
+
+    def digest(self, entity_type: str, original: str) -> str:
+        """HMAC-SHA256 of (entity_type, original value) under the cache's secret key."""
+        message = f"{entity_type}\0{original}".encode("utf-8")
+        return hmac.new(self._secret_key, message, hashlib.sha256).hexdigest()
+
+    def _remember(self, key: Tuple[str, str, str], replacement: str) -> None:
+        self._entries[key] = replacement
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_create(self, entity_type: str, original: str, create: Callable[[str, str], str],
+                      operators: str = "") -> str:
+        """
+        Returns the cached replacement, calling create(entity_type, original) only on a miss.
+
+        operators is the operators_key() of the config create() applies.
+        """
+        key = (operators, entity_type, self.digest(entity_type, original))
+        with self._lock:
+            replacement = self._entries.get(key)
+            if replacement is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return replacement
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT replacement FROM pseudonym_digests "
+                    "WHERE operators = ? AND entity_type = ? AND original_hmac = ?", key
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            replacement = create(entity_type, original)
+            self._remember(key, replacement)
+            if self._db is not None:
+                self._db.execute("INSERT OR IGNORE INTO pseudonym_digests VALUES (?, ?, ?, ?)", (*key, replacement))
+                self._pending_writes += 1
+                if self._pending_writes >= self.commit_every:
+                    self._db.commit()
+                    self._pending_writes = 0
+            return replacement
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pending_writes:
+                self._db.commit()
+                self._pending_writes = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+class PIIEngine:
+    """
+    Shared, lazily initialised Presidio analyzer + anonymizer.
+
+    Loading the spaCy NLP model behind AnalyzerEngine takes seconds and
+    hundreds of MB, so it happens once, on first use, and every module
+    (presidio.py, toxicity.py, ...) shares the same instance via get_pii_engine().
+    """
+
+    def __init__(self, language: str = "en"):
+        self.language = language
+        self._analyzer: Optional[AnalyzerEngine] = None
+        self._anonymizer: Optional[AnonymizerEngine] = None
+        self._lock = threading.Lock()
+
+    @property
+    def analyzer(self) -> AnalyzerEngine:
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    self._analyzer = AnalyzerEngine(supported_languages=[self.language])
+        return self._analyzer
+
+    @property
+    def anonymizer(self) -> AnonymizerEngine:
+        if self._anonymizer is None:
+            with self._lock:
+                if self._anonymizer is None:
+                    self._anonymizer = AnonymizerEngine()
+        return self._anonymizer
+
+    def warmup(self) -> None:
+        """Loads both engines up front (e.g. from a worker start hook)."""
+        self.analyzer
+        self.anonymizer
+
+    def analyze(self, text: str, entities: Optional[List[str]] = None, **kwargs) -> List[RecognizerResult]:
+        """
+        Finds PII in one text.
+
+        Args:
+            entities: Restrict detection to these entity types (e.g. ["EMAIL_ADDRESS", "PHONE_NUMBER"]).
+                Only recognizers supporting them are run. None runs all recognizers.
+        """
+        return self.analyzer.analyze(text=text, entities=entities, language=self.language, **kwargs)
+
+    def analyze_many(self, texts: Iterable[str], entities: Optional[List[str]] = None,
+                     batch_size: int = 32, **kwargs) -> List[List[RecognizerResult]]:
+        """
+        Batch version of analyze.
+
+        The spaCy pipeline runs through nlp.pipe (via the NLP engine's
+        process_batch) and the recognizers reuse those NLP artifacts.
+        """
+        texts = list(texts)
+        nlp_engine = self.analyzer.nlp_engine
+        results = []
+        for text, nlp_artifacts in nlp_engine.process_batch(texts, self.language, batch_size=batch_size):
+            results.append(self.analyzer.analyze(
+                text=text, entities=entities, language=self.language, nlp_artifacts=nlp_artifacts, **kwargs
+            ))
+        return results
+
+    def anonymize(self, text: str, analyzer_results: Optional[List[RecognizerResult]] = None,
+                  operators: Optional[Dict[str, OperatorConfig]] = None,
+                  entities: Optional[List[str]] = None,
+                  pseudonym_cache: Optional[PseudonymCache] = None) -> str:
+        """
+        Anonymizes one text, analyzing it first if no analyzer results are given.
+
+        With a pseudonym_cache, each (entity_type, value) is replaced consistently
+        and the operator only runs the first time a value is seen.
+        """
+        if analyzer_results is None:
+            analyzer_results = self.analyze(text, entities=entities)
+        operators = operators or DEFAULT_OPERATORS
+        if pseudonym_cache is not None:
+            return self._anonymize_consistent(text, analyzer_results, operators, pseudonym_cache)
+        return self.anonymizer.anonymize(
+            text=text,
+            analyzer_results=analyzer_results,
+            operators=operators
+        ).text
+
+    def _anonymize_consistent(self, text: str, analyzer_results: List[RecognizerResult],
+                              operators: Dict[str, OperatorConfig], cache: PseudonymCache) -> str:
+        def _run_operator(entity_type: str, value: str) -> str:
+            single = [RecognizerResult(entity_type, 0, len(value), 1.0)]
+            return self.anonymizer.anonymize(text=value, analyzer_results=single, operators=operators).text
+
+        # Overlapping spans are merged into their union, so no fragment of a
+        # detected value is left in clear text; the union takes the type of its
+        # longest (then highest-scoring) member.
+        ordered = sorted(analyzer_results, key=lambda r: (r.start, r.end))
+        spans = []  # [start, end, representative result]
+        for result in ordered:
+            if spans and result.start < spans[-1][1]:
+                span = spans[-1]
+                best = span[2]
+                if (result.end - result.start, result.score) > (best.end - best.start, best.score):
+                    span[2] = result
+                span[1] = max(span[1], result.end)
+            else:
+                spans.append([result.start, result.end, result])
+
+        config_key = operators_key(operators)
+        pieces, cursor = [], 0
+        for start, end, result in spans:
+            pieces.append(text[cursor:start])
+            pieces.append(cache.get_or_create(result.entity_type, text[start:end], _run_operator, config_key))
+            cursor = end
+        pieces.append(text[cursor:])
+        return "".join(pieces)
+
+    def anonymize_many(self, texts: Iterable[str], operators: Optional[Dict[str, OperatorConfig]] = None,
+                       entities: Optional[List[str]] = None, batch_size: int = 32,
+                       pseudonym_cache: Optional[PseudonymCache] = None) -> List[str]:
+        """Batch-analyzes the texts (nlp.pipe) and anonymizes each one."""
+        texts = list(texts)
+        all_results = self.analyze_many(texts, entities=entities, batch_size=batch_size)
+        return [
+            self.anonymize(text, analyzer_results=results, operators=operators, pseudonym_cache=pseudonym_cache)
+            for text, results in zip(texts, all_results)
+        ]
+
+_PII_ENGINE: Optional[PIIEngine] = None
+_PII_ENGINE_LOCK = threading.Lock()
+
+def get_pii_engine() -> PIIEngine:
+    """Returns the process-wide PIIEngine (created on first call, models loaded on first use)."""
+    global _PII_ENGINE
+    if _PII_ENGINE is None:
+        with _PII_ENGINE_LOCK:
+            if _PII_ENGINE is None:
+                _PII_ENGINE = PIIEngine()
+    return _PII_ENGINE
+
+# --- Tiered PII Check (regex pre-screen before the NLP pipeline) ---
+
+# Cheap, recall-oriented screens for Presidio's pattern-based entities. A text
+# that fails every screen cannot produce a match from the corresponding recognizer.
+_EMAIL_SCREEN = re.compile(r"@")
+# US SSN recognizer needs 9 digits (optionally separated by '-', ' ' or '.')
+_SSN_SCREEN = re.compile(r"\d(?:[-. ]?\d){8}")
+
+def _phone_screen(min_digits: int) -> re.Pattern:
+    # phonenumbers' matcher allows up to 4 punctuation/space characters between digit groups
+    return re.compile(r"\d(?:[\W_]{0,4}\d){%d,}" % (min_digits - 1))
+
+class TieredPIIChecker:
+    """
+    Two-tier PII check: compiled pattern pre-screen, then the full analyzer.
+
+    Most texts contain no '@' and no long digit run, so they are answered as
+    "no PII" without touching spaCy. Only texts that hit a screen, or calls
+    that ask for entities without a screen (e.g. PERSON, which needs NER),
+    go through PIIEngine.
+    """
+
+    def __init__(self, entities: Optional[List[str]] = None, engine: Optional[PIIEngine] = None,
+                 min_phone_digits: int = 5):
+        self.entities = entities or ["EMAIL_ADDRESS", "PHONE_NUMBER", "US_SSN"]
+        self._engine = engine
+        self._screens = {
+            "EMAIL_ADDRESS": _EMAIL_SCREEN,
+            "PHONE_NUMBER": _phone_screen(min_phone_digits),
+            "US_SSN": _SSN_SCREEN,
+        }
+        self._always_escalate = any(entity not in self._screens for entity in self.entities)
+        self._active_screens = [self._screens[e] for e in self.entities if e in self._screens]
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.short_circuited = 0
+
+    @property
+    def engine(self) -> PIIEngine:
+        return self._engine or get_pii_engine()
+
+    def might_contain_pii(self, text: str) -> bool:
+        """False means 'definitely no PII' for the configured entities."""
+        if self._always_escalate:
+            return True
+        return any(screen.search(text) for screen in self._active_screens)
+
+    def _count(self, checked: int, short_circuited: int) -> None:
+        with self._lock:
+            self.checked += checked
+            self.short_circuited += short_circuited
+
+    def analyze(self, text: str) -> List[RecognizerResult]:
+        if not self.might_contain_pii(text):
+            self._count(1, 1)
+            return []
+        self._count(1, 0)
+        return self.engine.analyze(text, entities=self.entities)
+
+    def analyze_many(self, texts: Iterable[str], batch_size: int = 32) -> List[List[RecognizerResult]]:
+        """Batch version of analyze; only texts that hit the pre-screen are sent (batched) to the analyzer."""
+        texts = list(texts)
+        results: List[List[RecognizerResult]] = [[] for _ in texts]
+        escalated = [i for i, text in enumerate(texts) if self.might_contain_pii(text)]
+        if escalated:
+            analyzed = self.engine.analyze_many([texts[i] for i in escalated], entities=self.entities,
+                                                batch_size=batch_size)
+            for i, text_results in zip(escalated, analyzed):
+                results[i] = text_results
+        self._count(len(texts), len(texts) - len(escalated))
+        return results
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "checked": self.checked,
+            "short_circuited": self.short_circuited,
+            "escalated": self.checked - self.short_circuited,
+            "short_circuit_rate": self.short_circuited / self.checked if self.checked else 0.0,
+        }
+
+# --- Streaming Anonymization (bounded memory for large documents) ---
+
+# End of a sentence (terminal punctuation + whitespace) or a line break
+_SENTENCE_BREAK_RE = re.compile(r"[.!?][\"')\]]*\s+|\n\s*")
+
+def _iter_windows(source: TextIO, window_chars: int, overlap_chars: int,
+                  read_size: int) -> Iterator[Tuple[int, str, int]]:
+    """
+    Splits a text stream into overlapping windows cut on sentence boundaries.
+
+    Yields (window_start, window_text, commit_end) with absolute offsets. The
+    next window starts at commit_end, which lies inside the last
+    ~overlap_chars of the current window, so every span shorter than the
+    overlap is seen whole by at least one window.
+    """
+    buffer, buffer_start, eof = "", 0, False
+    while True:
+        while not eof and len(buffer) < window_chars:
+            block = source.read(read_size)
+            if block:
+                buffer += block
+            else:
+                eof = True
+        if not buffer:
+            return
+        if eof and len(buffer) <= window_chars:
+            yield buffer_start, buffer, buffer_start + len(buffer)
+            return
+
+        # Window end: last sentence break that still leaves room for the overlap
+        end = window_chars
+        for match in _SENTENCE_BREAK_RE.finditer(buffer, 2 * overlap_chars, window_chars):
+            end = match.end()
+        # Next window start: first sentence break inside the overlap region
+        match = _SENTENCE_BREAK_RE.search(buffer, end - overlap_chars, end)
+        next_start = match.end() if match and match.end() < end else end - overlap_chars
+
+        yield buffer_start, buffer[:end], buffer_start + next_start
+        buffer = buffer[next_start:]
+        buffer_start += next_start
+
+def anonymize_stream(source: TextIO, sink: TextIO, operators: Optional[Dict[str, OperatorConfig]] = None,
+                     entities: Optional[List[str]] = None, window_chars: int = 20_000,
+                     overlap_chars: int = 500, batch_size: int = 8, read_size: int = 1 << 16,
+                     engine: Optional[PIIEngine] = None,
+                     pseudonym_cache: Optional[PseudonymCache] = None) -> dict:
+    """
+    Anonymizes an arbitrarily large text stream with bounded memory.
+
+    The input is cut into overlapping sentence-aligned windows, which are
+    analyzed batch_size at a time (nlp.pipe). Each entity is kept from the
+    first window that sees it starting in its committed region; detections
+    that start inside text already written are clipped to the part not yet
+    written, so spans crossing a window boundary are masked exactly once and
+    never leak a tail. Output is written to sink as
+    soon as each window is resolved.
+
+    Peak memory is about batch_size * window_chars characters plus NLP state,
+    independent of the input size. Pass a pseudonym_cache for consistent
+    replacements across the whole document (and across resumed runs).
+
+    Returns:
+        Stats: characters processed, windows analyzed, entities anonymized.
+    """
+    if window_chars <= 2 * overlap_chars:
+        raise ValueError("window_chars must be more than twice overlap_chars.")
+    engine = engine or get_pii_engine()
+    operators = operators or DEFAULT_OPERATORS
+    stats = {"chars": 0, "windows": 0, "entities": 0}
+    written_end = 0
+
+    def _flush(batch):
+        nonlocal written_end
+        all_results = engine.analyze_many([text for _, text, _ in batch], entities=entities,
+                                          batch_size=len(batch))
+        for (start, text, commit_end), results in zip(batch, all_results):
+            # Spans starting in text already written are clipped to the unwritten part, not dropped,
+            # so the tail of an entity that crosses the previous commit point is still masked
+            kept = [r for r in results if start + r.end > written_end and start + r.start < commit_end]
+            segment_end = max([commit_end, written_end] + [start + r.end for r in kept])
+            segment = text[written_end - start:segment_end - start]
+            shifted = [
+                RecognizerResult(r.entity_type, max(start + r.start, written_end) - written_end,
+                                 start + r.end - written_end, r.score)
+                for r in kept
+            ]
+            if shifted:
+                segment = engine.anonymize(segment, analyzer_results=shifted, operators=operators,
+                                           pseudonym_cache=pseudonym_cache)
+            sink.write(segment)
+            stats["windows"] += 1
+            stats["entities"] += len(kept)
+            written_end = segment_end
+        stats["chars"] = written_end
+
+    batch = []
+    for window in _iter_windows(source, window_chars, overlap_chars, read_size):
+        batch.append(window)
+        if len(batch) >= batch_size:
+            _flush(batch)
+            batch = []
+    if batch:
+        _flush(batch)
+    return stats
+
+def anonymize_file(input_path: str, output_path: str, **kwargs) -> dict:
+    """File wrapper around anonymize_stream (UTF-8 in, UTF-8 out)."""
+    with open(input_path, encoding="utf-8") as source, open(output_path, "w", encoding="utf-8") as sink:
+        return anonymize_stream(source, sink, **kwargs)
+
+if __name__ == "__main__":
+    # 1. Initialize the engines (lazily, shared with toxicity.py)
+    engine = get_pii_engine()
+
+    # The text containing PII
+    text_to_anonymize = "My name is George Washington, and my email is g.washington@usa.gov. My phone number is 212-555-5555."
+
+    # 2. Analyze the text to find PII entities
+    analyzer_results = engine.analyze(text_to_anonymize)
+
+    # 3. Anonymize the text using the analyzer results and defined operators
+    anonymized_text = engine.anonymize(text_to_anonymize, analyzer_results=analyzer_results, operators=DEFAULT_OPERATORS)
 
-print(f"Original Text:\n{text_to_anonymize}\n")
-print(f"Anonymized Text:\n{anonymized_results.text}")
+    print(f"Original Text:\n{text_to_anonymize}\n")
+    print(f"Anonymized Text:\n{anonymized_text}")
 
-# Example Output:
-# Anonymized Text:
-# My name is <ANONYMIZED_ENTITY>, and my email is . My phone number is ***-***-5555.
\ No newline at end of file
+    # Example Output:
+    # Anonymized Text:
+    # My name is <ANONYMIZED_ENTITY>, and my email is . My phone number is ***-***-5555.
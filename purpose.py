@@ -2,6 +2,12 @@ import spacy
 from spacy.tokens import DocBin
 import random
 import os
+import hashlib
+import threading
+import time
+
+from clean_query import normalize_and_clean_queries, normalize_and_clean_query
+from verdict_cache import VerdictCache
 
 # 1. Define the Data
 # Structure: (text, {"cats": {"LABEL_NAME": 1.0/0.0}})
@@ -24,10 +30,16 @@ TRAIN_DATA = [
 ]
 
 # 2. Split Data (Training is essential for evaluation)
-random.shuffle(TRAIN_DATA)
+# Seeded, so rebuilding the DocBins gives the same split. For datasets beyond
+# this inline sample, use intent_data.py (JSONL -> sharded DocBins).
 TRAIN_SPLIT = 0.8
-train_set = TRAIN_DATA[:int(len(TRAIN_DATA) * TRAIN_SPLIT)]
-dev_set = TRAIN_DATA[int(len(TRAIN_DATA) * TRAIN_SPLIT):]
+SPLIT_SEED = 0
+
+def split_data(data, train_split=TRAIN_SPLIT, seed=SPLIT_SEED):
+    data = list(data)
+    random.Random(seed).shuffle(data)
+    cut = int(len(data) * train_split)
+    return data[:cut], data[cut:]
 
 # 3. Create DocBin Files
 def create_docbin(data, file_path):
@@ -36,7 +48,8 @@ def create_docbin(data, file_path):
     db = DocBin()
     
     for text, annotations in data:
-        doc = nlp(text)
+        # Train on the same clean_query normalization the model is served
+        doc = nlp(normalize_and_clean_query(text))
         # Apply the category labels to the Doc object
         doc.cats = annotations["cats"]
         db.add(doc)
@@ -47,43 +60,216 @@ def create_docbin(data, file_path):
     
     print(f"✅ Successfully created {file_path} with {len(data)} examples.")
 
-# Execute the creation
-create_docbin(train_set, "train.spacy")
-create_docbin(dev_set, "dev.spacy")
+def build_training_files(train_path="train.spacy", dev_path="dev.spacy"):
+    """Splits TRAIN_DATA and writes the train/dev DocBin files used by `spacy train`."""
+    train_set, dev_set = split_data(TRAIN_DATA)
+    create_docbin(train_set, train_path)
+    create_docbin(dev_set, dev_path)
 
 # python -m spacy init config --lang en --pipeline textcat config_base.cfg
 # python -m spacy init fill-config config_base.cfg config.cfg
 # python -m spacy train config.cfg --output ./output --paths.train ./train.spacy --paths.dev ./dev.spacy
+# or, from JSONL with timings: python intent_data.py examples.jsonl config.cfg
 
-import spacy
 # Import the LLM library you are using (e.g., openai, google-genai)
 # import openai 
 
 # --- STEP 1: LOAD THE SPACY INTENT MODEL ---
-try:
-    # Load your custom trained model from its saved path
-    # Replace './output/model-best' with your actual path
-    nlp_intent = spacy.load("./output_model/model-best") 
-    print("✅ spaCy Intent Checker Loaded.")
-except OSError:
-    print("🛑 ERROR: Could not load spaCy model. Check the path and ensure training was successful.")
-    # Exit or handle the error gracefully
+# Loaded on first use, so importing this module (e.g. from safety.py) stays cheap.
+# Point INTENT_MODEL_PATH at a model trained with another profile (intent_data.TEXTCAT_PROFILES) to serve it
+INTENT_MODEL_PATH = os.environ.get("INTENT_MODEL_PATH", "./output_model/model-best")
+nlp_intent = None
+intent_model_version = None
+_intent_model_attempted = False
+
+def model_fingerprint(path: str = None):
+    """Hash of the relative path, size and mtime of every file in the model directory; None if it is missing."""
+    path = path or INTENT_MODEL_PATH
+    if not os.path.isdir(path):
+        return None
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full_path = os.path.join(root, name)
+            stat = os.stat(full_path)
+            digest.update(f"{os.path.relpath(full_path, path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def load_intent_model():
+    """Returns the trained intent pipeline, loading it once; None if it could not be loaded."""
+    global nlp_intent, intent_model_version, _intent_model_attempted
+    if not _intent_model_attempted:
+        _intent_model_attempted = True
+        try:
+            # Load your custom trained model from its saved path
+            version = model_fingerprint()
+            nlp_intent = spacy.load(INTENT_MODEL_PATH)
+            intent_model_version = version
+            print("✅ spaCy Intent Checker Loaded.")
+        except OSError:
+            print("🛑 ERROR: Could not load spaCy model. Check the path and ensure training was successful.")
+    return nlp_intent
+
+def reload_intent_model():
+    """Loads the model from INTENT_MODEL_PATH again (e.g. after retraining)."""
+    global _intent_model_attempted
+    _intent_model_attempted = False
+    return load_intent_model()
     
 # Define the confidence threshold required for a 'CODE' classification
 CONFIDENCE_THRESHOLD = 0.85
 
-def check_query_intent(query: str) -> str:
+def check_query_intent(query: str, cache=None) -> str:
     """
     Classifies the user query using the trained spaCy TextCategorizer.
+    With an IntentCache, repeated (normalized) queries skip the model.
     
     Returns: 'CODE' if intent is high-confidence, otherwise 'OFF_TOPIC'.
     """
-    doc = nlp_intent(query)
-    
-    # Get the score for the 'CODE' label
-    code_score = doc.cats.get("CODE", 0.0)
+    code_score = code_intent_score(query, cache)
     
-    if code_score >= CONFIDENCE_THRESHOLD:
+    if code_score is not None and code_score >= CONFIDENCE_THRESHOLD:
         return "CODE"
     else:
-        return "OFF_TOPIC"
\ No newline at end of file
+        return "OFF_TOPIC"
+
+def code_intent_score(query: str, cache=None):
+    """
+    Returns the model's 'CODE' score for the query, or None if the intent model is unavailable.
+
+    The model scores the clean_query normalization of the query (the same
+    text it is trained on and cached under), so the cached and uncached
+    paths always agree.
+    """
+    if cache is not None:
+        return cache.code_score(query)
+    return _normalized_code_score(normalize_and_clean_query(query))
+
+def _normalized_code_score(text: str):
+    nlp = load_intent_model()
+    if nlp is None:
+        return None
+    doc = nlp(text)
+    
+    # Get the score for the 'CODE' label
+    return doc.cats.get("CODE", 0.0)
+
+def intent_only_disabled(nlp):
+    """Pipeline components the textcat does not need (the tokenizer is not a component, so it always runs)."""
+    keep = {name for name in nlp.pipe_names if name.startswith("textcat")}
+    # A textcat listening to a shared embedding layer still needs that component
+    keep.update(name for name in ("tok2vec", "transformer") if name in nlp.pipe_names)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+def check_query_intents(queries, batch_size: int = 256, n_process: int = 1,
+                        threshold: float = CONFIDENCE_THRESHOLD, cache=None) -> list:
+    """
+    Batch version of check_query_intent for many queries.
+
+    Streams the queries through nlp.pipe with every component except the
+    textcat (and the tokenizer) disabled. n_process > 1 forks worker
+    processes, which only pays off for large inputs. With an IntentCache,
+    only queries missing from the cache are sent through the model.
+
+    Returns: one (label, code_score) tuple per query, in input order; label is
+    'CODE' or 'OFF_TOPIC' and code_score is None if the model is unavailable.
+    """
+    queries = list(queries)
+    if cache is not None:
+        scores = cache.code_scores(queries, batch_size=batch_size, n_process=n_process)
+    else:
+        scores = _pipe_code_scores(queries, batch_size, n_process)
+    return [("CODE" if score is not None and score >= threshold else "OFF_TOPIC", score) for score in scores]
+
+def _pipe_code_scores(queries, batch_size: int = 256, n_process: int = 1) -> list:
+    return _pipe_normalized_code_scores(normalize_and_clean_queries(queries), batch_size, n_process)
+
+def _pipe_normalized_code_scores(texts, batch_size: int = 256, n_process: int = 1) -> list:
+    nlp = load_intent_model()
+    if nlp is None:
+        return [None] * len(texts)
+    return [doc.cats.get("CODE", 0.0)
+            for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                                disable=intent_only_disabled(nlp))]
+
+class IntentCache:
+    """
+    Memory LRU + optional on-disk (SQLite) cache of intent scores.
+
+    Queries are keyed on their clean_query normalization, and the model
+    scores that normalized text, so repeated and near-identical questions
+    (case, punctuation, URLs, spacing) reuse one model run and a cached
+    score depends only on its key. Keys include a fingerprint of the model directory, re-checked
+    every check_interval seconds: when the model is retrained, it is
+    reloaded and scores from the old model are never served again.
+    """
+
+    CHECK_NAME = "intent"
+
+    def __init__(self, maxsize: int = 50_000, db_path: str = None, check_interval: float = 30.0,
+                 ttl_seconds: float = 30 * 24 * 3600):
+        self._store = VerdictCache(maxsize=maxsize, ttl_seconds=ttl_seconds, db_path=db_path)
+        self.check_interval = check_interval
+        self.invalidations = 0
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def model_version(self):
+        """Fingerprint of the model being served; reloads the model if the directory changed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                load_intent_model()
+                on_disk = model_fingerprint()
+                if on_disk is not None and on_disk != intent_model_version:
+                    reload_intent_model()
+                if self._version is not None and intent_model_version != self._version:
+                    self.invalidations += 1
+                self._version = intent_model_version
+            return self._version
+
+    def code_score(self, query: str):
+        version = self.model_version()
+        if version is None:
+            return code_intent_score(query)
+        return self._store.get_or_compute(normalize_and_clean_query(query), self.CHECK_NAME, version,
+                                          _normalized_code_score)
+
+    def code_scores(self, queries, batch_size: int = 256, n_process: int = 1) -> list:
+        """Cached scores for many queries; misses are deduplicated and scored in one nlp.pipe pass."""
+        queries = list(queries)
+        version = self.model_version()
+        if version is None:
+            return _pipe_code_scores(queries, batch_size, n_process)
+
+        keys = normalize_and_clean_queries(queries)
+        scores = [self._store.get(key, self.CHECK_NAME, version) for key in keys]
+        missing = {}
+        for i, (key, score) in enumerate(zip(keys, scores)):
+            if score is None:
+                missing.setdefault(key, []).append(i)
+        if missing:
+            fresh = _pipe_normalized_code_scores(list(missing), batch_size, n_process)
+            for (key, positions), score in zip(missing.items(), fresh):
+                if score is not None:
+                    self._store.put(key, self.CHECK_NAME, version, score)
+                for i in positions:
+                    scores[i] = score
+        return scores
+
+    def flush(self) -> None:
+        self._store.flush()
+
+    def close(self) -> None:
+        self._store.close()
+
+    @property
+    def stats(self) -> dict:
+        return {**self._store.stats, "invalidations": self.invalidations, "model_version": self._version}
+
+if __name__ == "__main__":
+    build_training_files()
+    load_intent_model()
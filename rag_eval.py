@@ -1,3 +1,7 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
 # --- Mock Embedding Function (REPLACE with your actual embedding API/Library call) ---
 # NOTE: In a real app, this would call an API or a library like SentenceTransformers
 def get_embedding(text: str) -> List[float]:
@@ -5,6 +9,17 @@ def get_embedding(text: str) -> List[float]:
     length = len(text)
     return [0.1 * length, 0.2 * length, 0.3 * length] 
 
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Batched version of get_embedding (REPLACE with one batched API/model call, e.g. model.encode(texts))."""
+    return [get_embedding(text) for text in texts]
+
+def calculate_cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
+    a = np.asarray(vec_a, dtype=np.float64)
+    b = np.asarray(vec_b, dtype=np.float64)
+    norms = np.linalg.norm(a) * np.linalg.norm(b)
+    # A zero vector has no direction; treat it as unrelated
+    return float(np.dot(a, b) / norms) if norms else 0.0
+
 # --- RAG Evaluation Function ---
 def evaluate_rag_output(query: str, context_chunks: List[str], llm_answer: str) -> dict:
     
@@ -41,19 +56,74 @@ def evaluate_rag_output(query: str, context_chunks: List[str], llm_answer: str)
         "context_precision": context_precision
     }
 
-# --- Example RAG Output (Simulated) ---
-user_query = "What are Python decorators?"
-retrieved_context = [
-    "Decorators are a design pattern that allows a user to add new functionality to an existing object.",
-    "They are wrappers that execute code before and after the function they wrap.",
-    "The best way to plant a rosebush is in partial sun." # Irrelevant chunk
-]
-generated_answer = "Python decorators allow you to wrap functions to alter their behavior, typically using the '@' symbol."
-
-# --- Run Evaluation ---
-evaluation_scores = evaluate_rag_output(user_query, retrieved_context, generated_answer)
-
-print("\n--- RAG Component Scores ---")
-print(f"Query/Answer Similarity (Relevance): {evaluation_scores['query_answer_similarity']:.4f}")
-print(f"Context/Answer Similarity (Faithfulness Proxy): {evaluation_scores['context_answer_similarity']:.4f}")
-print(f"Context Precision (Retriever Quality): {evaluation_scores['context_precision']:.4f}")
\ No newline at end of file
+# --- Batched, Vectorized Evaluation ---
+# (query, context_chunks, llm_answer)
+RAGSample = Tuple[str, Sequence[str], str]
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def evaluate_rag_outputs(samples: Sequence[RAGSample],
+                         embed_batch: Callable[[List[str]], List[List[float]]] = None) -> List[Dict[str, float]]:
+    """
+    Batch version of evaluate_rag_output for many (query, chunks, answer) triples.
+
+    Every unique text (queries, answers, joined contexts and chunks) is
+    embedded once in a single embed_batch call (default: get_embeddings)
+    and stacked into a NumPy matrix with unit-length rows. All similarities
+    then come from row-wise products of that matrix, and context precision
+    is a per-sample mean taken with np.bincount, so there is no Python loop
+    over pairs. Scores match evaluate_rag_output up to float rounding.
+    """
+    embed_batch = embed_batch or get_embeddings
+    samples = [(query, list(chunks), answer) for query, chunks, answer in samples]
+    if not samples:
+        return []
+
+    index: Dict[str, int] = {}
+
+    def _id(text: str) -> int:
+        return index.setdefault(text, len(index))
+
+    query_ids = np.array([_id(query) for query, _, _ in samples])
+    answer_ids = np.array([_id(answer) for _, _, answer in samples])
+    context_ids = np.array([_id(" ".join(chunks)) for _, chunks, _ in samples])
+    chunk_ids = np.array([_id(chunk) for _, chunks, _ in samples for chunk in chunks], dtype=np.intp)
+    chunk_owner = np.array([i for i, (_, chunks, _) in enumerate(samples) for _ in chunks], dtype=np.intp)
+
+    unit = _unit_rows(np.asarray(embed_batch(list(index)), dtype=np.float64))
+
+    query_answer = np.einsum("ij,ij->i", unit[query_ids], unit[answer_ids])
+    context_answer = np.einsum("ij,ij->i", unit[context_ids], unit[answer_ids])
+    chunk_sims = np.einsum("ij,ij->i", unit[chunk_ids], unit[query_ids[chunk_owner]])
+    chunk_counts = np.bincount(chunk_owner, minlength=len(samples))
+    chunk_totals = np.bincount(chunk_owner, weights=chunk_sims, minlength=len(samples))
+    precision = np.divide(chunk_totals, chunk_counts, out=np.zeros(len(samples)), where=chunk_counts > 0)
+
+    return [
+        {
+            "query_answer_similarity": float(query_answer[i]),
+            "context_answer_similarity": float(context_answer[i]),
+            "context_precision": float(precision[i]),
+        }
+        for i in range(len(samples))
+    ]
+
+if __name__ == "__main__":
+    # --- Example RAG Output (Simulated) ---
+    user_query = "What are Python decorators?"
+    retrieved_context = [
+        "Decorators are a design pattern that allows a user to add new functionality to an existing object.",
+        "They are wrappers that execute code before and after the function they wrap.",
+        "The best way to plant a rosebush is in partial sun." # Irrelevant chunk
+    ]
+    generated_answer = "Python decorators allow you to wrap functions to alter their behavior, typically using the '@' symbol."
+
+    # --- Run Evaluation ---
+    evaluation_scores = evaluate_rag_output(user_query, retrieved_context, generated_answer)
+
+    print("\n--- RAG Component Scores ---")
+    print(f"Query/Answer Similarity (Relevance): {evaluation_scores['query_answer_similarity']:.4f}")
+    print(f"Context/Answer Similarity (Faithfulness Proxy): {evaluation_scores['context_answer_similarity']:.4f}")
+    print(f"Context Precision (Retriever Quality): {evaluation_scores['context_precision']:.4f}")
@@ -1,8 +1,20 @@
+import asyncio
+import csv
+import hashlib
+import os
+import random
+import sys
+import threading
 import requests
 import json
 import time
 
-
+# Gemini endpoint and key (override through the environment)
+API_KEY = os.environ.get("GEMINI_API_KEY", "")
+API_URL = os.environ.get(
+    "GEMINI_API_URL",
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+)
 
 SAFETY_INSTRUCTION = """
 You are a highly sensitive Content Safety and Bias Auditor. Your only function is to analyze the user's query and determine its safety, clarity, and objectivity based on the following rules.
@@ -27,10 +39,33 @@ You are a highly sensitive Content Safety and Bias Auditor. Your only function i
 - Query: "What is the capital of France?" -> Response: [CLEAN_QUERY] A clear, factual question about geography.
 """
 
-def make_api_call(user_query, system_instruction, max_retries=3):
+def moderation_model_version(system_instruction):
+    """The model endpoint plus a hash of the instruction; cached verdicts never cross either."""
+    instruction_hash = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()[:16]
+    return f"{API_URL}#{instruction_hash}"
+
+def make_api_call(user_query, system_instruction, max_retries=3, cache=None,
+                  rate_limiter=None, coalesce=False):
     """
     Makes a request to the Gemini API with exponential backoff.
+
+    With a verdict_cache.VerdictCache, repeated queries are answered from the
+    cache (failed calls are not cached). A shared RateLimiter paces requests
+    before they are sent, and coalesce=True makes identical concurrent
+    queries share one upstream call.
     """
+    if cache is not None:
+        return cache.get_or_compute(
+            user_query, "moderation", moderation_model_version(system_instruction),
+            lambda query: make_api_call(query, system_instruction, max_retries,
+                                        rate_limiter=rate_limiter, coalesce=coalesce)
+        )
+    if coalesce:
+        return _API_CALL_FLIGHTS.do(
+            (user_query, system_instruction),
+            lambda: make_api_call(user_query, system_instruction, max_retries, rate_limiter=rate_limiter)
+        )
+
     if not API_KEY:
         print("\n--- ERROR ---\nAPI Key is missing. Please replace '' with your actual API key.")
         return None
@@ -41,7 +76,10 @@ def make_api_call(user_query, system_instruction, max_retries=3):
         "systemInstruction": {"parts": [{"text": system_instruction}]},
     }
 
+    request_tokens = estimate_tokens(user_query) + estimate_tokens(system_instruction)
     for attempt in range(max_retries):
+        if rate_limiter is not None:
+            rate_limiter.acquire(request_tokens)
         try:
             response = requests.post(
                 f"{API_URL}?key={API_KEY}", 
@@ -51,11 +89,7 @@ def make_api_call(user_query, system_instruction, max_retries=3):
             )
             response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
             
-            result = response.json()
-            # Extracting the text content
-            text = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '').strip()
-            
-            return text
+            return _extract_text(response.json())
 
         except requests.exceptions.HTTPError as e:
             # Check for 429 Too Many Requests, which usually requires backoff
@@ -86,6 +120,550 @@ def make_api_call(user_query, system_instruction, max_retries=3):
             
     return None # Return None if all retries fail
 
+def _extract_text(result):
+    # Extracting the text content
+    return result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '').strip()
+
+# --- Client-Side Rate Limiting and Request Coalescing ---
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return max(1, len(text) // 4)
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+
+    One instance is meant to be shared by every caller of the API (threads
+    via acquire(), asyncio tasks via acquire_async()). Each call reserves its
+    request and tokens immediately and is told how long to wait, so callers
+    are served in arrival order and never sleep while holding the lock.
+
+    In any W-second window at most (burst + rate * W) is let through, so the
+    default burst_seconds=0 (strict pacing, one request of slack, and
+    tokens_per_minute / requests_per_minute tokens of slack) keeps a
+    sliding-window quota configured with the same numbers from ever being
+    exceeded. Raise it to allow short bursts against fixed-window quotas.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None, burst_seconds=0.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_rate = requests_per_minute / 60
+        self._token_rate = (tokens_per_minute or 0) / 60
+        self._request_capacity = max(1.0, self._request_rate * burst_seconds)
+        # One request's share of the token budget, so an idle limiter lets a typical call straight through
+        self._token_capacity = max(self._token_rate * burst_seconds, (tokens_per_minute or 0) / requests_per_minute)
+        self._request_budget = self._request_capacity
+        self._token_budget = self._token_capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _reserve(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_refill
+            self._last_refill = now
+            self._request_budget = min(self._request_capacity, self._request_budget + elapsed * self._request_rate)
+            self._request_budget -= 1
+            wait = max(0.0, -self._request_budget / self._request_rate)
+
+            if self.tokens_per_minute:
+                # A request larger than the whole per-minute budget is paced as if it used all of it
+                tokens = min(tokens, self.tokens_per_minute)
+                self._token_budget = min(self._token_capacity, self._token_budget + elapsed * self._token_rate)
+                self._token_budget -= tokens
+                wait = max(wait, -self._token_budget / self._token_rate)
+            self.waited_seconds += wait
+            return wait
+
+    def acquire(self, tokens=1):
+        """Blocks until the request fits the budget."""
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Non-blocking variant for asyncio callers."""
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls (threads): one runs, the others wait
+    for its result. If the call raises, every waiter gets the same exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+            else:
+                self.coalesced += 1
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+# Shared by make_api_call(..., coalesce=True) across threads
+_API_CALL_FLIGHTS = SingleFlight()
+
+# --- Async Moderation Client ---
+
+class AsyncModerationClient:
+    """
+    Pooled, non-blocking client for the moderation call.
+
+    One aiohttp session (keep-alive connection pool) is reused for every
+    request, a semaphore bounds the number of in-flight HTTP calls, and
+    429/5xx responses are retried with exponential backoff plus jitter (or
+    the server's Retry-After, capped at max_backoff) via asyncio.sleep. The
+    semaphore slot is released while a request waits, so other requests keep
+    flowing. The constant systemInstruction part of the payload is
+    serialized once.
+    An optional shared RateLimiter paces calls before they hit the API, and
+    identical in-flight queries are coalesced into one upstream call.
+
+    Usage:
+        async with AsyncModerationClient() as client:
+            responses = await client.moderate_many(queries)
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, system_instruction=SAFETY_INSTRUCTION, api_url=None, api_key=None,
+                 max_concurrency=16, max_retries=3, timeout=15, base_backoff=1.0, max_backoff=30.0,
+                 rate_limiter=None, coalesce=True):
+        self.api_url = api_url or API_URL
+        self.api_key = api_key if api_key is not None else API_KEY
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # Everything after the per-query "contents" field, serialized once
+        self._payload_tail = ',"systemInstruction":' + json.dumps({"parts": [{"text": system_instruction}]}) + "}"
+        self.rate_limiter = rate_limiter
+        self.coalesce = coalesce
+        self._instruction_tokens = estimate_tokens(system_instruction)
+        self._in_flight = {}
+        self.coalesced = 0
+        self.upstream_requests = 0
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Content-Type': 'application/json'},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _payload(self, user_query):
+        return '{"contents":' + json.dumps([{"parts": [{"text": user_query}]}]) + self._payload_tail
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            # A large (or hostile) Retry-After must not stall the caller indefinitely
+            return min(retry_after, self.max_backoff)
+        # Full jitter spreads retries from concurrent callers apart
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    async def moderate(self, user_query):
+        """Async equivalent of make_api_call(user_query, system_instruction); None on failure."""
+        return (await self.moderate_timed(user_query))[0]
+
+    async def moderate_timed(self, user_query):
+        """
+        Like moderate(), but returns (response, http_seconds).
+
+        http_seconds is the time spent in HTTP calls only, summed over retry
+        attempts; waiting for a concurrency slot, the rate limiter or a
+        backoff is not included. Coalesced callers share the upstream call's
+        time.
+        """
+        if not self.coalesce:
+            return await self._moderate_upstream(user_query)
+
+        pending = self._in_flight.get(user_query)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[user_query] = future
+        try:
+            result = await self._moderate_upstream(user_query)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failed call with no followers doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[user_query]
+
+    async def _moderate_upstream(self, user_query):
+        import aiohttp
+
+        if not self.api_key:
+            print("\n--- ERROR ---\nAPI Key is missing. Please set GEMINI_API_KEY.")
+            return None, 0.0
+
+        data = self._payload(user_query)
+        url = f"{self.api_url}?key={self.api_key}"
+        request_tokens = estimate_tokens(user_query) + self._instruction_tokens
+        http_seconds = 0.0
+        for attempt in range(self.max_retries):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(request_tokens)
+            result, wait_time = None, None
+            # The slot is held for the HTTP call only, never while pacing or backing off
+            async with self._semaphore:
+                self.upstream_requests += 1
+                started = time.perf_counter()
+                try:
+                    async with self._session.post(url, data=data) as response:
+                        if response.status == 200:
+                            result = _extract_text(await response.json(content_type=None))
+                        elif response.status in self.RETRY_STATUSES and attempt < self.max_retries - 1:
+                            retry_after = response.headers.get("Retry-After")
+                            wait_time = self._backoff(attempt, float(retry_after) if retry_after and retry_after.isdigit() else None)
+                        else:
+                            print(f"API Error ({response.status}): {await response.text()}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt < self.max_retries - 1:
+                        wait_time = self._backoff(attempt)
+                    else:
+                        print(f"Failed to connect to API after {self.max_retries} attempts: {e}")
+                except Exception as e:
+                    # e.g. a 200 with a non-JSON body or no candidates; fail this query only
+                    print(f"An unexpected error occurred: {e}")
+                http_seconds += time.perf_counter() - started
+            if wait_time is None:
+                return result, http_seconds
+            # Back off after the response and the slot are released, so both are free meanwhile
+            await asyncio.sleep(wait_time)
+        return None, http_seconds
+
+    async def moderate_many(self, user_queries):
+        """Moderates many queries concurrently (bounded by max_concurrency); results keep input order."""
+        return await asyncio.gather(*(self.moderate(query) for query in user_queries))
+
+# --- Tiered Moderation (local pre-classifier) ---
+
+def _default_intent_scorer(query):
+    try:
+        from purpose import code_intent_score
+    except ImportError:  # spaCy not installed: no local intent signal
+        return None
+    return code_intent_score(query)
+
+class TieredModerator:
+    """
+    Answers obviously clean or obviously harmful queries locally and sends
+    only the uncertain ones to the LLM auditor.
+
+    Tiers, cheapest first:
+      1. prompt-injection deny list hit               -> [BLOCKED_HARMFUL]
+      2. local toxicity >= block_toxicity_threshold   -> [BLOCKED_HARMFUL]
+      3. toxicity <= clean_toxicity_threshold and
+         purpose.py CODE intent >= clean_intent_threshold -> [CLEAN_QUERY]
+      4. anything else, or a missing local signal     -> make_api_call
+    Local answers use the auditor's prefixes, so callers parse them the same
+    way. report() shows how much traffic stayed local and its latency.
+    """
+
+    LOCAL_BLOCKED_RESPONSE = "[BLOCKED_HARMFUL]"
+    LOCAL_CLEAN_RESPONSE = "[CLEAN_QUERY] An on-topic coding question (resolved locally)."
+    TIERS = ("injection", "toxicity", "clean", "escalated")
+
+    def __init__(self, system_instruction=SAFETY_INSTRUCTION, clean_intent_threshold=0.85,
+                 clean_toxicity_threshold=0.05, block_toxicity_threshold=0.95, deny_list=None,
+                 intent_scorer=None, toxicity_scorer=None, escalate=None, **api_call_kwargs):
+        from prompt_injection import DEFAULT_DENY_LIST
+        from toxicity import local_toxicity_score
+
+        self.clean_intent_threshold = clean_intent_threshold
+        self.clean_toxicity_threshold = clean_toxicity_threshold
+        self.block_toxicity_threshold = block_toxicity_threshold
+        self.deny_list = deny_list or DEFAULT_DENY_LIST
+        self.intent_scorer = intent_scorer or _default_intent_scorer
+        self.toxicity_scorer = toxicity_scorer or local_toxicity_score
+        self.escalate = escalate or (lambda query: make_api_call(query, system_instruction, **api_call_kwargs))
+        self._counts = dict.fromkeys(self.TIERS, 0)
+        self._seconds = dict.fromkeys(self.TIERS, 0.0)
+        self._lock = threading.Lock()
+
+    def _resolve_locally(self, query):
+        """Returns (tier, response) when a local signal is decisive, else None."""
+        if self.deny_list.contains_any(query):
+            return "injection", self.LOCAL_BLOCKED_RESPONSE
+        toxicity = self.toxicity_scorer(query)
+        if toxicity is None:
+            return None
+        if toxicity >= self.block_toxicity_threshold:
+            return "toxicity", self.LOCAL_BLOCKED_RESPONSE
+        if toxicity <= self.clean_toxicity_threshold:
+            intent = self.intent_scorer(query)
+            if intent is not None and intent >= self.clean_intent_threshold:
+                return "clean", self.LOCAL_CLEAN_RESPONSE
+        return None
+
+    def classify(self, user_query):
+        """Returns {"response", "tier", "latency_ms"}; tier says which stage answered."""
+        start = time.perf_counter()
+        resolved = self._resolve_locally(user_query)
+        tier, response = resolved if resolved else ("escalated", self.escalate(user_query))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._counts[tier] += 1
+            self._seconds[tier] += elapsed
+        return {"response": response, "tier": tier, "latency_ms": round(elapsed * 1000, 3)}
+
+    def moderate(self, user_query):
+        """Drop-in for make_api_call(user_query, SAFETY_INSTRUCTION)."""
+        return self.classify(user_query)["response"]
+
+    def report(self):
+        """
+        Share of traffic resolved locally and the latency effect.
+
+        The all-LLM baseline is estimated as the mean escalated latency for
+        every query, so the saving is only meaningful once some queries have
+        escalated.
+        """
+        with self._lock:
+            counts, seconds = dict(self._counts), dict(self._seconds)
+        total = sum(counts.values())
+        local = total - counts["escalated"]
+        mean_ms = sum(seconds.values()) / total * 1000 if total else 0.0
+        escalated_ms = seconds["escalated"] / counts["escalated"] * 1000 if counts["escalated"] else 0.0
+        local_ms = (sum(seconds.values()) - seconds["escalated"]) / local * 1000 if local else 0.0
+        return {
+            "total": total,
+            "by_tier": counts,
+            "resolved_locally": local / total if total else 0.0,
+            "mean_latency_ms": round(mean_ms, 3),
+            "local_mean_latency_ms": round(local_ms, 3),
+            "escalated_mean_latency_ms": round(escalated_ms, 3),
+            "latency_reduction": round(1 - mean_ms / escalated_ms, 3) if escalated_ms else 0.0,
+        }
+
+# --- Offline Batch Moderation ---
+
+MODERATION_VERDICTS = {
+    "[BLOCKED_HARMFUL]": "blocked",
+    "[CLARIFICATION_NEEDED]": "clarification_needed",
+    "[CLEAN_QUERY]": "clean",
+}
+
+def parse_moderation_response(model_response):
+    """
+    Splits an auditor response into (verdict, detail).
+
+    verdict is "blocked", "clarification_needed" or "clean" for the three
+    prefixes, "unexpected" for any other format and "error" when the call
+    failed (None); detail is the text after the prefix.
+    """
+    if model_response is None:
+        return "error", ""
+    text = model_response.strip()
+    for prefix, verdict in MODERATION_VERDICTS.items():
+        if text.startswith(prefix):
+            return verdict, text[len(prefix):].strip()
+    return "unexpected", text
+
+def _iter_query_rows(input_path, text_field="query", id_field="id"):
+    """Yields (row_id, record) from a JSONL or CSV file; row_id falls back to the row number."""
+    with open(input_path, encoding="utf-8", newline="") as f:
+        if input_path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for number, record in enumerate(rows):
+            row_id = record.get(id_field)
+            if row_id is None or row_id == "":
+                row_id = number
+            yield row_id, record
+
+def _load_checkpoint(output_path, id_field="id"):
+    """
+    Returns the ids already moderated in output_path and compacts the file.
+
+    Failed rows ("error" verdict) are removed so they are retried, and a line
+    half-written by a crash is dropped; the file is rewritten (atomically)
+    only when something was removed, so it always holds one record per id.
+    """
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    kept, removed = [], False
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                removed = True  # truncated by a crash
+                break
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            row_id = str(record[id_field])
+            if record.get("verdict") == "error" or row_id in finished:
+                removed = True
+                continue
+            finished.add(row_id)
+            kept.append(line)
+    if removed:
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, output_path)
+    return finished
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+async def _moderate_rows(client, rows, out, text_field, id_field, window, stats, latencies):
+    """Keeps up to `window` rows in flight and appends each result to `out` as it completes."""
+
+    async def _moderate_row(row_id, record):
+        try:
+            response, latency = await client.moderate_timed(str(record.get(text_field) or ""))
+        except Exception as e:
+            print(f"Moderation failed for row {row_id}: {e}")
+            response, latency = None, 0.0
+        return row_id, record, response, latency
+
+    def _write(result):
+        row_id, record, response, latency = result
+        verdict, detail = parse_moderation_response(response)
+        out.write(json.dumps({
+            id_field: row_id,
+            text_field: record.get(text_field),
+            "verdict": verdict,
+            "detail": detail,
+            "latency_ms": round(latency * 1000, 1),
+        }, ensure_ascii=False) + "\n")
+        out.flush()
+        stats["processed"] += 1
+        stats["verdicts"][verdict] = stats["verdicts"].get(verdict, 0) + 1
+        latencies.append(latency)
+
+    pending = set()
+    for row_id, record in rows:
+        pending.add(asyncio.create_task(_moderate_row(row_id, record)))
+        if len(pending) >= window:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                _write(task.result())
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            _write(task.result())
+
+def run_batch_moderation(input_path, output_path, text_field="query", id_field="id",
+                         system_instruction=SAFETY_INSTRUCTION, max_concurrency=16,
+                         rate_limiter=None, api_url=None, api_key=None, verbose=True):
+    """
+    Moderates every query in a JSONL or CSV file without user interaction.
+
+    Queries go through AsyncModerationClient concurrently, the auditor
+    prefix of each response is parsed into a verdict, and one JSONL record
+    (id, query, verdict, detail, latency_ms) is appended to output_path as
+    soon as it completes, so results arrive out of input order. The output
+    file doubles as the checkpoint: rerunning after a crash skips every id
+    already written and only retries rows that failed, whose old "error"
+    records are removed first, so the file keeps one record per id.
+
+    latency_ms is the time spent in HTTP calls for the row (see
+    AsyncModerationClient.moderate_timed), not time queued behind other rows.
+
+    Returns:
+        Stats: rows read, skipped (already done), processed, counts per
+        verdict, wall time, queries/sec and latency percentiles in ms.
+    """
+    finished = _load_checkpoint(output_path, id_field)
+    stats = {"rows": 0, "skipped": 0, "processed": 0, "verdicts": {}}
+    latencies = []
+
+    def _remaining():
+        for row_id, record in _iter_query_rows(input_path, text_field, id_field):
+            stats["rows"] += 1
+            if str(row_id) in finished:
+                stats["skipped"] += 1
+                continue
+            yield row_id, record
+
+    async def _run():
+        async with AsyncModerationClient(system_instruction, api_url=api_url, api_key=api_key,
+                                         max_concurrency=max_concurrency,
+                                         rate_limiter=rate_limiter) as client:
+            with open(output_path, "a", encoding="utf-8") as out:
+                await _moderate_rows(client, _remaining(), out, text_field, id_field,
+                                     2 * max_concurrency, stats, latencies)
+
+    start = time.perf_counter()
+    asyncio.run(_run())
+    wall_time = time.perf_counter() - start
+
+    latencies.sort()
+    stats.update({
+        "wall_time_s": round(wall_time, 3),
+        "queries_per_sec": round(stats["processed"] / wall_time, 1) if wall_time else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 1),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        },
+    })
+    if verbose:
+        print("--- Batch Moderation Summary ---")
+        print(f"Rows: {stats['rows']} (skipped from checkpoint: {stats['skipped']}, processed: {stats['processed']})")
+        print("Verdicts: " + ", ".join(f"{verdict}={count}" for verdict, count in sorted(stats["verdicts"].items())))
+        print(f"Throughput: {stats['queries_per_sec']} queries/sec over {stats['wall_time_s']} s")
+        latency = stats["latency_ms"]
+        print(f"Latency (ms): p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    return stats
+
 def run_moderation_loop():
     """
     Runs the main loop to check the user query across 2 iterations.
@@ -155,4 +733,9 @@ def run_moderation_loop():
     print("\n--- Content Audit Finished ---")
 
 if __name__ == "__main__":
-    run_moderation_loop()
\ No newline at end of file
+    # python safety.py                       -> interactive audit loop
+    # python safety.py queries.jsonl out.jsonl -> offline batch run (JSONL or CSV input)
+    if len(sys.argv) >= 3:
+        run_batch_moderation(sys.argv[1], sys.argv[2])
+    else:
+        run_moderation_loop()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubModerationServer:
+    """
+    Local stand-in for the Gemini generateContent endpoint.
+
+    Answers with the auditor prefixes after a fixed latency, and can inject
+    a 429 on every Nth request to exercise the retry path. With
+    quota_requests set, it also enforces a sliding-window quota
+    (quota_requests per quota_window seconds) and rejects the excess with 429.
+    """
+
+    def __init__(self, latency: float = 0.02, fail_every: int = 0, port: int = 0,
+                 quota_requests: int = 0, quota_window: float = 60.0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.quota_requests = quota_requests
+        self.quota_window = quota_window
+        self.requests = 0
+        self.rejected = 0
+        self._accepted_at = deque()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, payload, headers = stub.handle(json.loads(body))
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1beta/models/stub:generateContent"
+
+    def classify(self, query: str) -> str:
+        if "ignore" in query.lower():
+            return "[BLOCKED_HARMFUL]"
+        if "best" in query.lower():
+            return "[CLARIFICATION_NEEDED] Please rephrase using objective criteria."
+        return "[CLEAN_QUERY] A clear, factual question."
+
+    def handle(self, payload: dict):
+        """Returns (status, json payload, extra headers) for one request."""
+        with self._lock:
+            self.requests += 1
+            count = self.requests
+            if self.quota_requests:
+                now = time.monotonic()
+                while self._accepted_at and now - self._accepted_at[0] >= self.quota_window:
+                    self._accepted_at.popleft()
+                if len(self._accepted_at) >= self.quota_requests:
+                    self.rejected += 1
+                    return 429, {"error": {"code": 429, "message": "Quota exceeded"}}, {}
+                self._accepted_at.append(now)
+        time.sleep(self.latency)
+        if self.fail_every and count % self.fail_every == 0:
+            return 429, {"error": {"code": 429, "message": "Resource exhausted"}}, {}
+        query = payload["contents"][0]["parts"][0]["text"]
+        text = self.classify(query)
+        return 200, {"candidates": [{"content": {"parts": [{"text": text}]}}]}, {}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
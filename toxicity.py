@@ -1,38 +1,226 @@
-from transformers import pipeline
-from presidio_analyzer import AnalyzerEngine
-from Dbias import bias_classification # Uses a specialized model (DistilBERT-based)
+import functools
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-# --- Configuration and Initialization ---
+# Heavy libraries (transformers, Dbias, Presidio/spaCy) are imported inside the
+# loaders below, so importing this module stays fast and loads nothing.
+
+# --- Guardrail Model Registry ---
+
+class GuardrailRegistry:
+    """
+    Loads each guardrail model on first use.
+
+    Models can be preloaded explicitly with warmup() (e.g. from a worker start
+    hook) and disabled by configuration, in which case they are never loaded
+    and their check passes with a "disabled" reason.
+    """
+
+    _NOT_LOADED = object()
+
+    def __init__(self, disabled=()):
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self.load_seconds = {}
+        self.disabled = set(disabled)
+
+    def register(self, name: str, loader) -> None:
+        self._loaders[name] = loader
+        self._models[name] = self._NOT_LOADED
+        self._locks[name] = threading.Lock()
+
+    def is_enabled(self, name: str) -> bool:
+        return name not in self.disabled
+
+    def is_loaded(self, name: str) -> bool:
+        return self._models[name] is not self._NOT_LOADED
+
+    def get(self, name: str):
+        """Returns the model, loading it on first use (one load even under concurrent callers)."""
+        if not self.is_enabled(name):
+            raise RuntimeError(f"Guardrail {name!r} is disabled (GUARDRAILS_DISABLED)")
+        model = self._models[name]
+        if model is self._NOT_LOADED:
+            with self._locks[name]:
+                model = self._models[name]
+                if model is self._NOT_LOADED:
+                    start = time.perf_counter()
+                    model = self._loaders[name]()
+                    self.load_seconds[name] = time.perf_counter() - start
+                    self._models[name] = model
+        return model
+
+    def warmup(self, names=None) -> dict:
+        """Preloads the given (default: all enabled) models and returns their load times."""
+        for name in names or self._loaders:
+            if self.is_enabled(name):
+                self.get(name)
+        return dict(self.load_seconds)
+
+# --- Inference Backend (transformers / ONNX Runtime) ---
+
+TOXICITY_MODEL = "SkolkovoInstitute/roberta_toxicity_classifier"
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli" # A strong default model for ZSC
+BIAS_MODEL = "d4data/bias-detection-model" # The model Dbias loads
+
+# "torch" (plain transformers, fp32), "onnx" (ONNX Runtime, fp32) or
+# "onnx-int8" (ONNX Runtime with dynamic int8 quantization)
+GUARDRAILS_BACKENDS = ("torch", "onnx", "onnx-int8")
+GUARDRAILS_BACKEND = os.environ.get("GUARDRAILS_BACKEND", "torch")
+ONNX_CACHE_DIR = os.environ.get(
+    "GUARDRAILS_ONNX_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "guardrails_onnx")
+)
+
+def _build_cache_dir(final_dir: str, build) -> None:
+    """
+    Runs build(tmp_dir) in a scratch directory and renames it to final_dir.
+
+    The rename is atomic, so final_dir only ever exists complete: a crash
+    mid-export leaves nothing behind, and when two workers export at once the
+    first rename wins and the other discards its copy.
+    """
+    os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(final_dir))
+    try:
+        build(tmp_dir)
+        os.replace(tmp_dir, final_dir)
+    except OSError:
+        if not os.path.isdir(final_dir):
+            raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _export_onnx_model(model_id: str, quantize: bool) -> str:
+    """Exports (and optionally int8-quantizes) a HF model once; later calls reuse the cached files."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    base_dir = os.path.join(ONNX_CACHE_DIR, model_id.replace("/", "--"))
+    fp32_dir = os.path.join(base_dir, "fp32")
+    if not os.path.isdir(fp32_dir):
+        def export(tmp_dir):
+            model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+            model.save_pretrained(tmp_dir)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(tmp_dir)
+        _build_cache_dir(fp32_dir, export)
+    if not quantize:
+        return fp32_dir
+
+    int8_dir = os.path.join(base_dir, "int8")
+    if not os.path.isdir(int8_dir):
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        def quantize_to(tmp_dir):
+            ORTQuantizer.from_pretrained(fp32_dir).quantize(save_dir=tmp_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(tmp_dir)
+        _build_cache_dir(int8_dir, quantize_to)
+    return int8_dir
+
+def _validate_backend(backend: str) -> str:
+    if backend not in GUARDRAILS_BACKENDS:
+        raise ValueError(f"Unknown guardrail backend: {backend!r} (expected one of {', '.join(GUARDRAILS_BACKENDS)})")
+    return backend
+
+def build_classifier_pipeline(task: str, model_id: str, backend: str = None):
+    """Builds a transformers pipeline for the task on the selected backend."""
+    backend = _validate_backend(backend or GUARDRAILS_BACKEND)
+    from transformers import AutoTokenizer, pipeline
+
+    if backend == "torch":
+        return pipeline(task, model=model_id)
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    quantize = backend == "onnx-int8"
+    model_dir = _export_onnx_model(model_id, quantize)
+    model = ORTModelForSequenceClassification.from_pretrained(
+        model_dir, file_name="model_quantized.onnx" if quantize else "model.onnx"
+    )
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_dir))
 
 # 1. Toxicity Classifier (Fast & Pre-trained)
-# We use a zero-shot classification pipeline for general-purpose text analysis, 
-# which is good for quick safety checks. A dedicated toxicity model like detoxify is also a great choice.
+# A dedicated RoBERTa toxicity model, which is good for quick safety checks.
 # For simplicity, we'll mock the pipeline output if you can't install specific models quickly.
-try:
-    toxicity_pipeline = pipeline("sentiment-analysis", model="SkolkovoInstitute/roberta_toxicity_classifier")
-except Exception:
-    # Fallback/Mock for quick testing
-    print("Warning: Could not load RoBERTa toxicity model. Using mock function.")
-    toxicity_pipeline = None
+# Only the plain torch backend keeps that fallback: a misspelled backend or a
+# failed ONNX export is a configuration error and is raised, not masked.
+def _load_toxicity_pipeline():
+    if _validate_backend(GUARDRAILS_BACKEND) != "torch":
+        return build_classifier_pipeline("sentiment-analysis", TOXICITY_MODEL)
+    try:
+        return build_classifier_pipeline("sentiment-analysis", TOXICITY_MODEL, backend="torch")
+    except Exception:
+        # Fallback/Mock for quick testing
+        print("Warning: Could not load RoBERTa toxicity model. Using mock function.")
+        return None
 
 # 2. Bias Classifier (Dbias)
-# Dbias provides a classification function based on a fine-tuned DistilBERT model.
+# Dbias wraps a fine-tuned DistilBERT model (BIAS_MODEL) and loads it on import.
+# We build our own text-classification pipeline on its model and tokenizer, so batch_size and
+# length-sorted micro-batches reach the model instead of one forward pass per text.
 # NOTE: Dbias may require specific Python and dependency versions.
-bias_classifier = bias_classification.classifier 
+def _load_bias_classifier():
+    from Dbias import bias_classification # Uses a specialized model (DistilBERT-based)
+    from transformers import pipeline
+    return pipeline("text-classification", model=bias_classification.model,
+                    tokenizer=bias_classification.tokenizer)
 
 # 3. PII Analyzer (from previous steps)
-pii_analyzer = AnalyzerEngine() 
+# Only pattern-based entities are needed here, so only their recognizers run, and
+# a regex pre-screen answers most texts without invoking the NLP pipeline at all.
+# The Presidio engine is shared with presidio.py.
+PII_LEAKAGE_ENTITIES = ["EMAIL_ADDRESS", "PHONE_NUMBER", "US_SSN"]
+
+def _load_pii_checker():
+    from presidio import TieredPIIChecker, get_pii_engine
+    # No engine.warmup(): texts cleared by the pre-screen never need spaCy
+    return TieredPIIChecker(PII_LEAKAGE_ENTITIES, engine=get_pii_engine())
+
+# 4. Zero-Shot Harm Classifier (see score_harmful_labels)
+def _load_zero_shot_pipeline():
+    return build_classifier_pipeline("zero-shot-classification", ZERO_SHOT_MODEL)
+
+# Comma-separated guardrails to switch off, e.g. GUARDRAILS_DISABLED="bias,zero_shot"
+GUARDRAILS = GuardrailRegistry(
+    disabled=[name.strip() for name in os.environ.get("GUARDRAILS_DISABLED", "").split(",") if name.strip()]
+)
+GUARDRAILS.register("toxicity", _load_toxicity_pipeline)
+GUARDRAILS.register("bias", _load_bias_classifier)
+GUARDRAILS.register("pii", _load_pii_checker)
+GUARDRAILS.register("zero_shot", _load_zero_shot_pipeline)
+
+def warmup_guardrails(names=None) -> dict:
+    """Warmup hook: loads the enabled guardrail models now instead of on the first request."""
+    return GUARDRAILS.warmup(names)
+
+# Decision thresholds shared by the single and batched checks
+TOXICITY_THRESHOLD = 0.8
+BIAS_THRESHOLD = 0.7
 
 # --- Core Evaluation Functions ---
 
-def check_toxicity(text: str, threshold: float = 0.8) -> dict:
+def check_toxicity(text: str, threshold: float = TOXICITY_THRESHOLD) -> dict:
     """Checks for general toxicity using a classification model."""
+    if not GUARDRAILS.is_enabled("toxicity"):
+        return {"is_toxic": False, "score": 0.0, "reason": "Toxicity check disabled."}
+
+    toxicity_pipeline = GUARDRAILS.get("toxicity")
     if not toxicity_pipeline:
         # Mock result for demonstration
         is_toxic = "swear" in text.lower() or "hate" in text.lower()
         return {"is_toxic": is_toxic, "score": 1.0 if is_toxic else 0.0, "reason": "Mocked toxicity check failed."}
         
     result = toxicity_pipeline(text)[0]
+    return _toxicity_verdict(result, threshold)
+
+def _toxicity_verdict(result: dict, threshold: float) -> dict:
     score = result['score'] if result['label'] == 'toxic' else 1.0 - result['score']
     
     return {
@@ -41,32 +229,58 @@ def check_toxicity(text: str, threshold: float = 0.8) -> dict:
         "reason": f"Toxicity score of {score:.2f} detected."
     }
 
-def check_bias_and_stereotypes(text: str, threshold: float = 0.7) -> dict:
+def local_toxicity_score(text: str):
+    """
+    Toxicity probability from the local model, or None when the model is
+    disabled or failed to load (never the keyword mock), so callers that
+    route on it can fall back to a stronger check.
+    """
+    if not GUARDRAILS.is_enabled("toxicity"):
+        return None
+    toxicity_pipeline = GUARDRAILS.get("toxicity")
+    if not toxicity_pipeline:
+        return None
+    result = toxicity_pipeline(text)[0]
+    return result['score'] if result['label'] == 'toxic' else 1.0 - result['score']
+
+def check_bias_and_stereotypes(text: str, threshold: float = BIAS_THRESHOLD) -> dict:
     """Checks for bias using the Dbias classification module."""
+    if not GUARDRAILS.is_enabled("bias"):
+        return {"is_biased": False, "score": 0.0, "reason": "Bias check disabled."}
     try:
         # The Dbias classifier returns a label (e.g., 'Biased', 'Unbiased') and a confidence score
-        result = bias_classifier(text) 
-        
-        # Parse the result based on the structure of the Dbias output
-        if isinstance(result, list) and result:
-            label = result[0].get('label', 'Unbiased')
-            score = result[0].get('score', 0.0)
-            
-            is_biased = label.lower() == 'biased' and score >= threshold
-            return {
-                "is_biased": is_biased,
-                "score": score,
-                "reason": f"Bias classification: {label} with confidence {score:.2f}."
-            }
-        return {"is_biased": False, "score": 0.0, "reason": "Dbias returned an unexpected format or no result."}
+        result = GUARDRAILS.get("bias")(text) 
+        return _bias_verdict(result, threshold)
     except Exception as e:
         # Catch errors if Dbias model fails to load/run
-        return {"is_biased": False, "score": 0.0, "reason": f"Bias check failed (library error): {e}"}
+        return _bias_error_verdict(e)
+
+def _bias_verdict(result, threshold: float) -> dict:
+    # Parse the result based on the structure of the Dbias output
+    if isinstance(result, list) and result:
+        label = result[0].get('label', 'Unbiased')
+        score = result[0].get('score', 0.0)
+        
+        is_biased = label.lower() == 'biased' and score >= threshold
+        return {
+            "is_biased": is_biased,
+            "score": score,
+            "reason": f"Bias classification: {label} with confidence {score:.2f}."
+        }
+    return {"is_biased": False, "score": 0.0, "reason": "Dbias returned an unexpected format or no result."}
+
+_BIAS_ERROR_REASON = "Bias check failed (library error)"
+
+def _bias_error_verdict(e: Exception) -> dict:
+    return {"is_biased": False, "score": 0.0, "reason": f"{_BIAS_ERROR_REASON}: {e}"}
 
 def check_pii_leakage(text: str) -> dict:
     """Checks for PII (emails, phone numbers, etc.) using Presidio."""
-    results = pii_analyzer.analyze(text=text, entities=["EMAIL_ADDRESS", "PHONE_NUMBER", "US_SSN"], language='en')
-    
+    if not GUARDRAILS.is_enabled("pii"):
+        return {"has_pii": False, "count": 0, "entities_found": []}
+    return _pii_verdict(GUARDRAILS.get("pii").analyze(text))
+
+def _pii_verdict(results) -> dict:
     if results:
         return {
             "has_pii": True,
@@ -77,55 +291,192 @@ def check_pii_leakage(text: str) -> dict:
 
 # --- Combined Guardrail Function ---
 
-def run_safety_guardrails(llm_output: str) -> dict:
-    """Runs all non-LLM based safety checks."""
-    
+@functools.lru_cache(maxsize=None)
+def _model_revision(model_id: str) -> str:
+    """Hub commit of the model files in use (from the local HF cache), or 'unknown'."""
+    try:
+        from transformers import AutoConfig
+        return AutoConfig.from_pretrained(model_id)._commit_hash or "unknown"
+    except Exception:
+        return "unknown"
+
+@functools.lru_cache(maxsize=None)
+def _package_version(name: str) -> str:
+    # Read from package metadata: importing Dbias would load its model
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "missing"
+
+def guardrails_model_version() -> str:
+    """
+    Identifies everything a guardrail verdict depends on: model ids and
+    resolved revisions, library versions, backend, thresholds and disabled
+    checks. Upgrading a model or a package therefore starts a new cache key.
+    """
+    return "|".join([
+        f"{TOXICITY_MODEL}@{_model_revision(TOXICITY_MODEL)}", f"{BIAS_MODEL}@{_model_revision(BIAS_MODEL)}",
+        "presidio:" + ",".join(PII_LEAKAGE_ENTITIES), GUARDRAILS_BACKEND,
+        *(f"{name}=={_package_version(name)}" for name in ("transformers", "Dbias", "presidio_analyzer")),
+        f"tox>={TOXICITY_THRESHOLD}", f"bias>={BIAS_THRESHOLD}",
+        "disabled:" + ",".join(sorted(GUARDRAILS.disabled)),
+    ])
+
+def run_safety_guardrails(llm_output: str, cache=None) -> dict:
+    """
+    Runs all non-LLM based safety checks.
+
+    Pass a verdict_cache.VerdictCache to reuse verdicts for repeated outputs;
+    entries are keyed on guardrails_model_version(), so they never cross models.
+    Verdicts produced while a model was unavailable (keyword mock, bias error
+    path) are returned but never cached, so they cannot outlive the outage.
+    """
+    if cache is None:
+        return _run_safety_guardrails(llm_output)[0]
+
+    version = guardrails_model_version()
+    verdict = cache.get(llm_output, "safety_guardrails", version)
+    if verdict is None:
+        verdict, degraded = _run_safety_guardrails(llm_output)
+        if not degraded:
+            cache.put(llm_output, "safety_guardrails", version, verdict)
+    return verdict
+
+def _run_safety_guardrails(llm_output: str):
+    """Returns (verdict, degraded); degraded means a check ran on its fallback path."""
     toxicity_check = check_toxicity(llm_output)
+    # The toxicity model is loaded by now; None means the keyword mock answered
+    degraded = GUARDRAILS.is_enabled("toxicity") and not GUARDRAILS.get("toxicity")
     if toxicity_check["is_toxic"]:
-        return {"PASS": False, "type": "TOXICITY", "details": toxicity_check}
+        return {"PASS": False, "type": "TOXICITY", "details": toxicity_check}, degraded
     
     bias_check = check_bias_and_stereotypes(llm_output)
+    degraded = degraded or bias_check["reason"].startswith(_BIAS_ERROR_REASON)
     if bias_check["is_biased"]:
-        return {"PASS": False, "type": "BIAS", "details": bias_check}
+        return {"PASS": False, "type": "BIAS", "details": bias_check}, degraded
     
     pii_check = check_pii_leakage(llm_output)
     if pii_check["has_pii"]:
-        return {"PASS": False, "type": "PII_LEAKAGE", "details": pii_check}
+        return {"PASS": False, "type": "PII_LEAKAGE", "details": pii_check}, degraded
 
     # If all checks pass
-    return {"PASS": True, "type": "SAFE", "details": {}}
+    return {"PASS": True, "type": "SAFE", "details": {}}, degraded
 
 
-# --- Test Cases ---
-print("--- Running Safety Tests ---")
+# --- Concurrent Guardrails ---
 
-output_safe = "A Python class is defined using the 'class' keyword."
-output_toxic = "That is a terrible idea and you are stupid."
-output_biased = "All doctors are men who specialize in surgery." # Dbias will attempt to flag this stereotype
-output_pii = "Contact me at 555-123-4567 for more details."
+# The heavy work (torch forward passes, spaCy) releases the GIL, so threads overlap well
+_GUARDRAIL_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="guardrail")
 
-# Note: Actual results depend on the specific version and configuration of the loaded models.
+# Same order, failure keys and verdict types as run_safety_guardrails
+_GUARDRAIL_CHECKS = [
+    ("TOXICITY", check_toxicity, "is_toxic"),
+    ("BIAS", check_bias_and_stereotypes, "is_biased"),
+    ("PII_LEAKAGE", check_pii_leakage, "has_pii"),
+]
 
-print("\n[Safe Output Test]")
-print(run_safety_guardrails(output_safe))
+def run_safety_guardrails_concurrent(llm_output: str, executor: ThreadPoolExecutor = None) -> dict:
+    """
+    Runs the three checks of run_safety_guardrails in parallel.
 
-print("\n[Toxic Output Test]")
-print(run_safety_guardrails(output_toxic))
+    Returns as soon as the verdict is decided: the first check (in the
+    sequential order) that fails, once every check before it has passed.
+    Checks still queued are cancelled and running ones are ignored, so the
+    result is always the one run_safety_guardrails would give.
+    """
+    executor = executor or _GUARDRAIL_EXECUTOR
+    futures = [executor.submit(check, llm_output) for _, check, _ in _GUARDRAIL_CHECKS]
+    pending = set(futures)
 
-print("\n[Biased Output Test]")
-print(run_safety_guardrails(output_biased))
+    try:
+        while True:
+            for (check_type, _, fail_key), future in zip(_GUARDRAIL_CHECKS, futures):
+                if not future.done():
+                    break  # An earlier check is still undecided
+                details = future.result()
+                if details[fail_key]:
+                    return {"PASS": False, "type": check_type, "details": details}
+            else:
+                # If all checks pass
+                return {"PASS": True, "type": "SAFE", "details": {}}
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+    finally:
+        for future in futures:
+            future.cancel()
 
-print("\n[PII Leakage Test]")
-print(run_safety_guardrails(output_pii))
+# --- Batched Guardrails ---
 
-###############################
+def _by_length(texts):
+    """Indices of texts sorted by length, so each micro-batch pads to a similar length."""
+    return sorted(range(len(texts)), key=lambda i: len(texts[i]))
 
-from transformers import pipeline
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
-zero_shot_pipeline = pipeline(
-    "zero-shot-classification", 
-    model="facebook/bart-large-mnli" # A strong default model for ZSC
-)
+def run_safety_guardrails_batch(llm_outputs, batch_size: int = 16) -> list:
+    """
+    Batched version of run_safety_guardrails.
+
+    Outputs are sorted by length and grouped into micro-batches, so the
+    toxicity model, the bias model and the PII NLP pipeline run one pass per
+    batch with minimal padding. Checks keep the sequential short-circuit
+    order: only outputs that pass toxicity are sent to the bias model, and
+    only those that pass bias to the PII check. Returns one verdict per
+    output, in input order, identical to calling run_safety_guardrails on
+    each.
+    """
+    llm_outputs = list(llm_outputs)
+    verdicts = [None] * len(llm_outputs)
+    order = _by_length(llm_outputs)
+
+    # 1. Toxicity
+    toxicity_pipeline = GUARDRAILS.get("toxicity") if GUARDRAILS.is_enabled("toxicity") else None
+    if toxicity_pipeline:
+        raw = toxicity_pipeline([llm_outputs[i] for i in order], batch_size=batch_size)
+        toxicity_checks = {i: _toxicity_verdict(result, TOXICITY_THRESHOLD) for i, result in zip(order, raw)}
+    else:
+        toxicity_checks = {i: check_toxicity(llm_outputs[i]) for i in order}
+    remaining = []
+    for i in order:
+        if toxicity_checks[i]["is_toxic"]:
+            verdicts[i] = {"PASS": False, "type": "TOXICITY", "details": toxicity_checks[i]}
+        else:
+            remaining.append(i)
+
+    # 2. Bias (the pipeline takes a list and returns one top label per text)
+    passed_bias = []
+    for chunk in _chunks(remaining, batch_size):
+        if not GUARDRAILS.is_enabled("bias"):
+            passed_bias.extend(chunk)
+            continue
+        try:
+            raw = GUARDRAILS.get("bias")([llm_outputs[i] for i in chunk], batch_size=batch_size)
+            bias_checks = [_bias_verdict([result], BIAS_THRESHOLD) for result in raw]
+        except Exception as e:
+            bias_checks = [_bias_error_verdict(e)] * len(chunk)
+        for i, bias_check in zip(chunk, bias_checks):
+            if bias_check["is_biased"]:
+                verdicts[i] = {"PASS": False, "type": "BIAS", "details": bias_check}
+            else:
+                passed_bias.append(i)
+
+    # 3. PII (pre-screened, then batched through nlp.pipe)
+    if GUARDRAILS.is_enabled("pii") and passed_bias:
+        pii_results = GUARDRAILS.get("pii").analyze_many([llm_outputs[i] for i in passed_bias], batch_size=batch_size)
+    else:
+        pii_results = [[] for _ in passed_bias]
+    for i, results in zip(passed_bias, pii_results):
+        pii_check = _pii_verdict(results)
+        if pii_check["has_pii"]:
+            verdicts[i] = {"PASS": False, "type": "PII_LEAKAGE", "details": pii_check}
+        else:
+            verdicts[i] = {"PASS": True, "type": "SAFE", "details": {}}
+
+    return verdicts
+
+# --- Zero-Shot Harm Labels ---
 
 # Define labels for bias detection
 HARMFUL_LABELS = [
@@ -134,10 +485,117 @@ HARMFUL_LABELS = [
     "is based on unfair generalization"
 ]
 
-llm_output = "All doctors are men who specialize in surgery."
+class ZeroShotBiasScorer:
+    """
+    Multi-label zero-shot NLI scorer with the hypothesis side tokenized once.
+
+    Equivalent to zero_shot_pipeline(text, labels, multi_label=True), but the
+    fixed label hypotheses are tokenized at construction, each text is
+    tokenized once, and all (text x label) pairs of a batch are packed into
+    length-sorted forward passes. Adding texts or labels only grows tensors.
+    """
+
+    def __init__(self, zero_shot_pipeline, labels=HARMFUL_LABELS,
+                 hypothesis_template: str = "This example is {}.", max_pairs_per_batch: int = 64):
+        import torch
+
+        self._torch = torch
+        self.model = zero_shot_pipeline.model
+        self.tokenizer = zero_shot_pipeline.tokenizer
+        self.labels = list(labels)
+        self.max_pairs_per_batch = max_pairs_per_batch
+        self._hypothesis_ids = self.tokenizer(
+            [hypothesis_template.format(label) for label in self.labels], add_special_tokens=False
+        )["input_ids"]
+        self._uses_token_types = "token_type_ids" in self.tokenizer.model_input_names
+        self._max_length = min(self.tokenizer.model_max_length, 1024)
+        self._special_tokens = self.tokenizer.num_special_tokens_to_add(pair=True)
+
+        # Same label lookup as the transformers zero-shot pipeline
+        label2id = {label.lower(): i for label, i in self.model.config.label2id.items()}
+        self._entail_id = next(i for label, i in label2id.items() if label.startswith("entail"))
+        self._contra_id = next((i for label, i in label2id.items() if label.startswith("contra")), 0)
+
+    def _encode_pair(self, premise_ids, hypothesis_ids):
+        # Truncate the premise only, like truncation="only_first"
+        room = self._max_length - self._special_tokens - len(hypothesis_ids)
+        premise_ids = premise_ids[:max(room, 0)]
+        encoded = {"input_ids": self.tokenizer.build_inputs_with_special_tokens(premise_ids, hypothesis_ids)}
+        if self._uses_token_types:
+            encoded["token_type_ids"] = self.tokenizer.create_token_type_ids_from_sequences(
+                premise_ids, hypothesis_ids
+            )
+        return encoded
+
+    def score_many(self, llm_outputs) -> list:
+        """Returns one {label: entailment probability} dict per output, in input order."""
+        llm_outputs = list(llm_outputs)
+        premise_ids = self.tokenizer(llm_outputs, add_special_tokens=False)["input_ids"]
+        pairs = [
+            (t, l, self._encode_pair(premise_ids[t], self._hypothesis_ids[l]))
+            for t in range(len(llm_outputs)) for l in range(len(self.labels))
+        ]
+        pairs.sort(key=lambda pair: len(pair[2]["input_ids"]))
+
+        scores = [dict() for _ in llm_outputs]
+        with self._torch.no_grad():
+            for start in range(0, len(pairs), self.max_pairs_per_batch):
+                chunk = pairs[start:start + self.max_pairs_per_batch]
+                batch = self.tokenizer.pad([encoded for _, _, encoded in chunk], return_tensors="pt")
+                logits = self.model(**batch).logits
+                # multi_label: softmax over (contradiction, entailment) for each pair independently
+                entail = logits[:, [self._contra_id, self._entail_id]].softmax(dim=-1)[:, 1]
+                for (t, l, _), score in zip(chunk, entail.tolist()):
+                    scores[t][self.labels[l]] = score
+        return scores
+
+_ZERO_SHOT_SCORERS = {}
+_ZERO_SHOT_SCORERS_LOCK = threading.Lock()
+
+def _zero_shot_scorer(labels) -> ZeroShotBiasScorer:
+    key = tuple(labels)
+    with _ZERO_SHOT_SCORERS_LOCK:
+        if key not in _ZERO_SHOT_SCORERS:
+            _ZERO_SHOT_SCORERS[key] = ZeroShotBiasScorer(GUARDRAILS.get("zero_shot"), labels)
+        return _ZERO_SHOT_SCORERS[key]
+
+def score_harmful_labels(llm_output: str, labels=HARMFUL_LABELS) -> dict:
+    """Scores each harmful label independently (multi-label zero-shot NLI); all 0.0 when disabled."""
+    return score_harmful_labels_batch([llm_output], labels)[0]
+
+def score_harmful_labels_batch(llm_outputs, labels=HARMFUL_LABELS) -> list:
+    """Batch version of score_harmful_labels: all (output x label) pairs in packed forward passes."""
+    if not GUARDRAILS.is_enabled("zero_shot"):
+        return [{label: 0.0 for label in labels} for _ in llm_outputs]
+    return _zero_shot_scorer(labels).score_many(llm_outputs)
+
+# --- Test Cases ---
+if __name__ == "__main__":
+    print("--- Running Safety Tests ---")
+
+    output_safe = "A Python class is defined using the 'class' keyword."
+    output_toxic = "That is a terrible idea and you are stupid."
+    output_biased = "All doctors are men who specialize in surgery." # Dbias will attempt to flag this stereotype
+    output_pii = "Contact me at 555-123-4567 for more details."
+
+    # Note: Actual results depend on the specific version and configuration of the loaded models.
+
+    print("\n[Safe Output Test]")
+    print(run_safety_guardrails(output_safe))
+
+    print("\n[Toxic Output Test]")
+    print(run_safety_guardrails(output_toxic))
+
+    print("\n[Biased Output Test]")
+    print(run_safety_guardrails(output_biased))
+
+    print("\n[PII Leakage Test]")
+    print(run_safety_guardrails(output_pii))
+
+    ###############################
 
-bias_result = zero_shot_pipeline(llm_output, HARMFUL_LABELS, multi_label=True)
+    llm_output = "All doctors are men who specialize in surgery."
 
-# The result contains scores for each label, which you can check against a threshold.
-print(bias_result['scores']) 
-# Output: [0.95, 0.10, 0.88] (Example: High score for 'contains gender stereotype')
\ No newline at end of file
+    # The result contains scores for each label, which you can check against a threshold.
+    print(score_harmful_labels(llm_output))
+    # Output: {'contains gender stereotype': 0.95, 'is based on unfair generalization': 0.88, ...}
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+class VerdictCache:
+    """
+    Two-tier cache for guardrail / moderation verdicts.
+
+    Entries are keyed on a hash of the normalized text, the check name and
+    the model version, so a verdict produced by one model (or prompt, or
+    threshold set) is never served for another. Tier 1 is an in-memory LRU;
+    tier 2 is an optional local SQLite file shared across restarts. Every
+    entry has a TTL.
+    """
+
+    def __init__(self, maxsize: int = 50_000, ttl_seconds: float = 24 * 3600,
+                 db_path: Optional[str] = None, commit_every: int = 100):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.commit_every = commit_every
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, check_name TEXT NOT NULL, model_version TEXT NOT NULL, "
+                "verdict TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def make_key(cls, text: str, check_name: str, model_version: str) -> str:
+        payload = "\0".join((check_name, model_version, cls.normalize(text)))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, expires_at: float, verdict_json: str) -> None:
+        self._entries[key] = (expires_at, verdict_json)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, text: str, check_name: str, model_version: str) -> Optional[Any]:
+        """Returns the cached verdict (a fresh copy) or None on a miss or expired entry."""
+        key = self.make_key(text, check_name, model_version)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(entry[1])
+                del self._entries[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, verdict FROM verdicts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] > now:
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return json.loads(row[1])
+            self.misses += 1
+            return None
+
+    def put(self, text: str, check_name: str, model_version: str, verdict: Any,
+            ttl_seconds: Optional[float] = None) -> None:
+        key = self.make_key(text, check_name, model_version)
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        verdict_json = json.dumps(verdict)
+        with self._lock:
+            self._remember(key, expires_at, verdict_json)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                    (key, check_name, model_version, verdict_json, expires_at)
+                )
+                self._pending_writes += 1
+                if self._pending_writes >= self.commit_every:
+                    self._db.commit()
+                    self._pending_writes = 0
+
+    def get_or_compute(self, text: str, check_name: str, model_version: str,
+                       compute: Callable[[str], Any], ttl_seconds: Optional[float] = None) -> Any:
+        """Returns the cached verdict, or computes it with compute(text) and caches it (None is not cached)."""
+        verdict = self.get(text, check_name, model_version)
+        if verdict is None:
+            verdict = compute(text)
+            if verdict is not None:
+                self.put(text, check_name, model_version, verdict, ttl_seconds)
+        return verdict
+
+    def purge_expired(self) -> int:
+        """Drops expired entries from both tiers; returns how many disk rows were removed."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+            if self._db is None:
+                return 0
+            removed = self._db.execute("DELETE FROM verdicts WHERE expires_at <= ?", (now,)).rowcount
+            self._db.commit()
+            self._pending_writes = 0
+            return removed
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pending_writes:
+                self._db.commit()
+                self._pending_writes = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }